@@ -1,14 +1,20 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, Response, stream_with_context, send_file, abort, g
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask_bcrypt import Bcrypt
-from werkzeug.security import generate_password_hash, check_password_hash
 import json
-from chat import EnvironmentalExpert
-from models import db, User, ChatMessage
+import base64
+from datetime import datetime
+from models import db, User, ChatMessage, create_indexes
 from forms import LoginForm, RegistrationForm
+from chat_jobs import ChatJobQueue
+from chat_persistence import ChatWriteBehind, COMMIT_ERRORS, COMMIT_ROWS, COMMIT_SECONDS
+from password_hashing import PasswordHasher, DEFAULT_METHOD
+from assets import build as build_assets, load_manifest, resolve as resolve_asset
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, from_stats
 from dotenv import load_dotenv
 import os
+import threading
+import time
 
 # Load environment variables
 load_dotenv()
@@ -18,13 +24,14 @@ app = Flask(__name__)
 
 # Configuration
 app.config['SECRET_KEY'] = 'dsxwbkwbcekcjkjnkne2'  # Change this!
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///chatbot.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///chatbot.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Queue chat rows and commit them in batches (set CHAT_WRITE_BEHIND=0 to commit per message)
+app.config['CHAT_WRITE_BEHIND'] = os.getenv('CHAT_WRITE_BEHIND', '1') == '1'
 
 # Initialize extensions
 CORS(app)
 db.init_app(app)
-bcrypt = Bcrypt(app)
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -36,8 +43,115 @@ login_manager.login_message = 'Please log in to access the chat.'
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-# Initialize the environmental expert
-expert = EnvironmentalExpert()
+# Fingerprinted static assets: static/dist is built at deploy time by `python assets.py`
+# and templates link to it through asset_url(). Workers only read the manifest.
+ASSET_MAX_AGE = 365 * 24 * 3600
+asset_manifest = load_manifest(app.static_folder)
+if not asset_manifest:
+    print("No asset manifest; serving plain static URLs until `python assets.py` is run")
+
+
+def _debug_manifest():
+    """Manifest rebuilt at most once per request, so edits under static/ show up in debug mode"""
+    if 'asset_manifest' not in g:
+        try:
+            g.asset_manifest = build_assets(app.static_folder)
+        except OSError as e:
+            print(f"Asset build failed, using the last manifest: {e}")
+            g.asset_manifest = load_manifest(app.static_folder)
+    return g.asset_manifest
+
+
+@app.template_global()
+def asset_url(filename):
+    """URL of the content-hashed copy of a static file, or its plain static URL if it has none"""
+    manifest = _debug_manifest() if app.debug else asset_manifest
+    asset = manifest.get(filename)
+    if asset is None:
+        return url_for('static', filename=filename)
+    return url_for('hashed_asset', filename=asset.path)
+
+# Password hashing runs in a process pool so login spikes don't pin request threads
+workers = os.getenv('PASSWORD_HASH_WORKERS')
+password_hasher = PasswordHasher(workers=int(workers) if workers is not None else None,
+                                 method=os.getenv('PASSWORD_HASH_METHOD', DEFAULT_METHOD))
+
+# The environmental expert (and pandas/numpy/requests with it) is built on first use,
+# so importing the app stays cheap for workers, scripts and init_db.py
+_expert = None
+_expert_lock = threading.Lock()
+
+
+def get_expert():
+    global _expert
+    if _expert is None:
+        with _expert_lock:
+            if _expert is None:
+                from chat import EnvironmentalExpert
+                _expert = EnvironmentalExpert()
+    return _expert
+
+# Dashboard series are read from the ETL output on first request, like the expert
+_series_store = None
+
+
+def get_series_store():
+    global _series_store
+    if _series_store is None:
+        with _expert_lock:
+            if _series_store is None:
+                from timeseries import SeriesStore
+                _series_store = SeriesStore(os.getenv('SERIES_DATA_DIR', 'data'),
+                                            cache_entries=int(os.getenv('SERIES_CACHE_ENTRIES', '256')))
+    return _series_store
+
+# Bounded worker pool for model-backed answers so they don't tie up request threads
+chat_jobs = ChatJobQueue(max_workers=int(os.getenv('CHAT_JOB_WORKERS', '8')),
+                         max_pending=int(os.getenv('CHAT_JOB_MAX_PENDING', '64')))
+
+# Write-behind batching of ChatMessage rows
+chat_writer = ChatWriteBehind(app,
+                              batch_size=int(os.getenv('CHAT_WRITE_BATCH_SIZE', '200')),
+                              flush_interval=float(os.getenv('CHAT_WRITE_FLUSH_INTERVAL', '0.5')))
+
+# Request latency per endpoint; streamed responses are timed up to their first byte
+REQUEST_SECONDS = REGISTRY.histogram('http_request_duration_seconds', 'Request handling time',
+                                     ('endpoint', 'method', 'status'))
+# Set to require "Authorization: Bearer <token>" on /metrics
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    start = g.get('request_start')
+    if start is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - start,
+                                (request.endpoint or 'unmatched', request.method, str(response.status_code)))
+    return response
+
+
+@REGISTRY.collector
+def collect_component_metrics():
+    """Counters the components already keep, read at scrape time; lazy ones only once built"""
+    families = from_stats('chat_write_behind', chat_writer.stats(), 'Write-behind ChatMessage queue',
+                          counters=('flushed_rows', 'flushed_batches', 'sync_writes',
+                                    'retries', 'row_fallbacks', 'lost_rows'))
+    if _series_store is not None:
+        families += from_stats('series_store', _series_store.stats(), 'Dashboard series store',
+                               counters=('hits', 'misses', 'loads'))
+    if _expert is not None:
+        families += _expert.collect_metrics()
+    return families
+
+DEFAULT_SOURCES = ['IPCC', 'NASA', 'NOAA', 'UNEP']
+HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', '50'))
+BATCH_MAX_MESSAGES = int(os.getenv('CHAT_BATCH_MAX_MESSAGES', '1000'))
+BATCH_MAX_CONCURRENCY = int(os.getenv('CHAT_BATCH_MAX_CONCURRENCY', '16'))
 
 # Authentication Routes
 @app.route('/login', methods=['GET', 'POST'])
@@ -47,7 +161,11 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        if user and check_password_hash(user.password_hash, form.password.data):
+        if user and password_hasher.verify(user.password_hash, form.password.data):
+            # Upgrade hashes stored with legacy method/cost parameters
+            if password_hasher.needs_rehash(user.password_hash):
+                user.password_hash = password_hasher.hash(form.password.data)
+                db.session.commit()
             login_user(user, remember=form.remember_me.data)
             return redirect(url_for('chat'))
         flash('Invalid email or password')
@@ -59,7 +177,7 @@ def register():
         return redirect(url_for('chat'))
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_password = generate_password_hash(form.password.data)
+        hashed_password = password_hasher.hash(form.password.data)
         user = User(username=form.username.data,
                     email=form.email.data,
                     password_hash=hashed_password)
@@ -85,13 +203,96 @@ def environment():
 def dashboard():
     return render_template('dashboard.html')
 
+@app.route('/assets/<path:filename>')
+def hashed_asset(filename):
+    # The URL changes whenever the content does, so the response never needs revalidating
+    found = resolve_asset(app.static_folder, filename, request.accept_encodings)
+    if found is None:
+        abort(404)
+    response = send_file(found.path, mimetype=found.mimetype or 'application/octet-stream',
+                         etag=found.etag, conditional=True, max_age=ASSET_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if found.encoding:
+        response.headers['Content-Encoding'] = found.encoding
+    return response
+
 @app.route('/chat')
 @login_required
 def chat():
-    # Load user's chat history
-    messages = ChatMessage.query.filter_by(user_id=current_user.id)\
-        .order_by(ChatMessage.timestamp.asc()).all()
-    return render_template('chat.html', messages=messages)
+    # Load only the latest page of the user's chat history; older pages load on scroll
+    messages, next_cursor = load_history_page(current_user.id, None, HISTORY_PAGE_SIZE)
+    return render_template('chat.html', messages=messages, next_cursor=next_cursor)
+
+def encode_cursor(message):
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    timestamp, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(timestamp), int(message_id)
+
+def load_history_page(user_id, cursor, limit):
+    """Keyset page of messages older than cursor, oldest first, plus the cursor for the next page"""
+    query = ChatMessage.query.filter(ChatMessage.user_id == user_id)
+    if cursor:
+        timestamp, message_id = decode_cursor(cursor)
+        # timestamp <= t bounds the index range scan; the OR breaks ties on id
+        query = query.filter(ChatMessage.timestamp <= timestamp, db.or_(
+            ChatMessage.timestamp < timestamp, ChatMessage.id < message_id
+        ))
+    rows = query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return list(reversed(rows[:limit])), next_cursor
+
+@app.route('/api/chat/history')
+@login_required
+def chat_history():
+    limit = min(max(request.args.get('limit', HISTORY_PAGE_SIZE, type=int), 1), 200)
+    try:
+        messages, next_cursor = load_history_page(current_user.id, request.args.get('before'), limit)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify({
+        'messages': [{
+            'id': m.id,
+            'user_message': m.user_message,
+            'bot_response': m.bot_response,
+            'sources': json.loads(m.sources) if m.sources else [],
+            'timestamp': m.timestamp.isoformat()
+        } for m in messages],
+        'next_cursor': next_cursor
+    })
+
+def save_chat_message(user_id, user_message, bot_response, sources):
+    if app.config['CHAT_WRITE_BEHIND']:
+        chat_writer.enqueue(user_id, user_message, bot_response, json.dumps(sources))
+        return
+    chat_message = ChatMessage(
+        user_id=user_id,
+        user_message=user_message,
+        bot_response=bot_response,
+        sources=json.dumps(sources)
+    )
+    start = time.perf_counter()
+    try:
+        db.session.add(chat_message)
+        db.session.commit()
+    except Exception:
+        COMMIT_ERRORS.inc(('direct',))
+        raise
+    COMMIT_SECONDS.observe(time.perf_counter() - start, ('direct',))
+    COMMIT_ROWS.inc(('direct',))
+
+def answer_in_background(user_id, user_message):
+    """Worker-pool job: get the model answer, then persist it"""
+    expert = get_expert()
+    bot_response = expert.get_response(user_message)
+    sources = expert.get_last_sources() or DEFAULT_SOURCES
+    with app.app_context():
+        save_chat_message(user_id, user_message, bot_response, sources)
+    return {'response': bot_response, 'sources': sources}
 
 @app.route('/api/chat', methods=['POST'])
 @login_required
@@ -101,27 +302,166 @@ def chat_api():
         user_message = data.get('message', '')
         if not user_message.strip():
             return jsonify({'error': 'Empty message'}), 400
-        # Get response from the EnvironmentalExpert
-        bot_response = expert.get_response(user_message)
-        sources = expert.get_last_sources()
+        expert = get_expert()
+        if data.get('async'):
+            # Dataset answers are fast, so only model-backed questions go to the pool
+            bot_response = expert.get_dataset_response(user_message)
+            if bot_response is None:
+                user_id = current_user.id
+                job = chat_jobs.submit(user_id, lambda: answer_in_background(user_id, user_message))
+                if job is None:
+                    return jsonify({'error': 'Server is busy. Please try again shortly.'}), 503
+                return jsonify(job.to_dict()), 202
+        else:
+            # Get response from the EnvironmentalExpert
+            bot_response = expert.get_response(user_message)
+        sources = expert.get_last_sources() or DEFAULT_SOURCES
         # Save to database
-        chat_message = ChatMessage(
-            user_id=current_user.id,
-            user_message=user_message,
-            bot_response=bot_response,
-            sources=json.dumps(sources) if sources else json.dumps(['IPCC', 'NASA', 'NOAA', 'UNEP'])
-        )
-        db.session.add(chat_message)
-        db.session.commit()
+        save_chat_message(current_user.id, user_message, bot_response, sources)
         response = {
             'response': bot_response,
-            'sources': sources if sources else ['IPCC', 'NASA', 'NOAA', 'UNEP']
+            'sources': sources
         }
         return jsonify(response)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/chat/batch', methods=['POST'])
+@login_required
+def chat_batch_api():
+    try:
+        data = request.get_json() or {}
+        messages = data.get('messages')
+        if not isinstance(messages, list) or not messages:
+            return jsonify({'error': 'Expected a non-empty "messages" list'}), 400
+        if len(messages) > BATCH_MAX_MESSAGES:
+            return jsonify({'error': f'At most {BATCH_MAX_MESSAGES} messages per batch'}), 400
+        if not all(isinstance(m, str) and m.strip() for m in messages):
+            return jsonify({'error': 'Empty message'}), 400
+        concurrency = data.get('concurrency', 8)
+        if isinstance(concurrency, bool) or not isinstance(concurrency, int):
+            return jsonify({'error': 'concurrency must be an integer'}), 400
+        concurrency = min(max(concurrency, 1), BATCH_MAX_CONCURRENCY)
+        results = get_expert().get_responses(messages, max_concurrency=concurrency)
+        # One bulk insert for the whole batch
+        start = time.perf_counter()
+        db.session.execute(db.insert(ChatMessage), [
+            {
+                'user_id': current_user.id,
+                'user_message': message,
+                'bot_response': result['response'],
+                'sources': json.dumps(result['sources'] or DEFAULT_SOURCES)
+            }
+            for message, result in zip(messages, results)
+        ])
+        db.session.commit()
+        COMMIT_SECONDS.observe(time.perf_counter() - start, ('bulk',))
+        COMMIT_ROWS.inc(('bulk',), len(messages))
+        return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/chat/stream', methods=['POST'])
+@login_required
+def chat_stream():
+    data = request.get_json() or {}
+    user_message = data.get('message', '')
+    if not user_message.strip():
+        return jsonify({'error': 'Empty message'}), 400
+    user_id = current_user.id
+
+    def generate():
+        # Server-Sent Events: one unnamed event per token, then a "done" event with the final text
+        for event in get_expert().stream_response(user_message):
+            if event.get('done'):
+                sources = event['sources'] or DEFAULT_SOURCES
+                save_chat_message(user_id, user_message, event['response'], sources)
+                final = json.dumps({'response': event['response'], 'sources': sources})
+                yield f"event: done\ndata: {final}\n\n"
+            else:
+                yield f"data: {json.dumps(event['token'])}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/chat/jobs/<job_id>')
+@login_required
+def chat_job(job_id):
+    # Long-poll: ?wait=N blocks up to N seconds (capped) for the answer
+    wait = min(max(request.args.get('wait', 0.0, type=float), 0.0), 25.0)
+    job = chat_jobs.wait(job_id, current_user.id, wait)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/dataset/version')
+def dataset_version():
+    """Dataset version currently served, for checking that an ETL run was picked up"""
+    return jsonify(get_expert().dataset_status())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """This process's metrics in the Prometheus text format"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        abort(401)
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE,
+                    headers={'Cache-Control': 'no-store'})
+
+@app.route('/api/series/<indicator>')
+def series_api(indicator):
+    """Indicator series for ?start=&end= (years, inclusive), downsampled to ?points="""
+    from timeseries import DEFAULT_POINTS, INDICATORS
+    if indicator not in INDICATORS:
+        return jsonify({'error': 'Unknown indicator', 'indicators': sorted(INDICATORS)}), 404
+    start = request.args.get('start', type=int)
+    end = request.args.get('end', type=int)
+    points = request.args.get('points', DEFAULT_POINTS, type=int)
+    if start is not None and end is not None and start > end:
+        return jsonify({'error': 'start must not be after end'}), 400
+    try:
+        encoded = get_series_store().response(indicator, start, end, points)
+    except FileNotFoundError:
+        return jsonify({'error': 'Series not available; run the ETL'}), 503
+    # Each encoding is its own representation, so each gets its own strong ETag
+    use_gzip = 'gzip' in request.accept_encodings
+    etag = f"{encoded.etag}-gzip" if use_gzip else encoded.etag
+    headers = {'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    response = Response(encoded.gzipped if use_gzip else encoded.body,
+                        mimetype='application/json', headers=headers)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+FORECAST_MAX_YEARS = int(os.getenv('FORECAST_MAX_YEARS', '200'))
+
+@app.route('/api/forecast')
+def forecast_api():
+    """Batch forecasts: ?indicators=co2,temperature for ?years=2030,2040 or ?start=&end="""
+    from forecast import FORECAST_INDICATORS, MAX_YEAR
+    names = [n for n in request.args.get('indicators', 'co2,temperature').split(',') if n]
+    unknown = [n for n in names if n not in FORECAST_INDICATORS]
+    if not names or unknown:
+        return jsonify({'error': 'Unknown indicator', 'indicators': sorted(FORECAST_INDICATORS)}), 400
+    expert = get_expert()
+    try:
+        if request.args.get('years'):
+            years = [int(y) for y in request.args['years'].split(',')]
+        else:
+            # Default to the 25 years after the data ends
+            last_year = expert.index.last_year or datetime.utcnow().year
+            start = request.args.get('start', last_year + 1, type=int)
+            end = request.args.get('end', min(start + 24, MAX_YEAR), type=int)
+            years = list(range(start, end + 1))
+    except ValueError:
+        return jsonify({'error': 'years must be integers'}), 400
+    if not years or len(years) > FORECAST_MAX_YEARS or max(years) > MAX_YEAR:
+        return jsonify({'error': f'Ask for 1-{FORECAST_MAX_YEARS} years up to {MAX_YEAR}'}), 400
+    return jsonify(expert.get_forecasts(names, years))
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        create_indexes()
     app.run(debug=True)
@@ -0,0 +1,182 @@
+"""Static asset pipeline: content-hashed copies of static/ with precompressed variants.
+
+Every file under static/ is copied into static/dist/ as name.<hash>.ext, and text assets also
+get .br (when the brotli package is installed) and .gz siblings compressed at maximum level.
+dist/manifest.json maps each source path to its hashed path, so templates can link to the
+hashed name through asset_url(). A new hash is a new URL, so the files are served as
+immutable and browsers never revalidate them. Builds are incremental: only sources whose
+mtime or size changed are hashed again.
+
+Usage: python assets.py [--static static]
+"""
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_NAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+# Already-compressed formats (images, fonts) gain nothing from another pass
+COMPRESSIBLE = {'.css', '.js', '.json', '.svg', '.txt', '.html', '.map', '.xml'}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^.]+)$' % HASH_LENGTH)
+
+
+class Asset(NamedTuple):
+    source: str                 # path relative to static/, e.g. css/style.css
+    path: str                   # hashed path relative to dist/, e.g. css/style.0123456789ab.css
+    sha256: str
+    mtime_ns: int
+    size: int
+    encodings: Tuple[str, ...]  # precompressed variants available, preferred first
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _build_asset(static_dir: Path, dist: Path, source: str) -> Asset:
+    src = static_dir / source
+    stat = src.stat()
+    data = src.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    stem, ext = os.path.splitext(source)
+    hashed = f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+    target = dist / hashed
+    if not target.exists():
+        _write_atomic(target, data)
+    encodings = []
+    if ext.lower() in COMPRESSIBLE:
+        for encoding, suffix in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            variant = target.with_name(target.name + suffix)
+            if not variant.exists():
+                compressed = _compress(data, encoding)
+                # Only worth serving if it actually saves bytes
+                if len(compressed) >= len(data):
+                    continue
+                _write_atomic(variant, compressed)
+            encodings.append(encoding)
+    return Asset(source, hashed, digest, stat.st_mtime_ns, stat.st_size, tuple(encodings))
+
+
+def build(static_dir='static') -> Dict[str, Asset]:
+    """Bring static/dist up to date with static/ and return the manifest"""
+    static_dir = Path(static_dir)
+    dist = static_dir / DIST_NAME
+    previous = load_manifest(static_dir)
+    manifest: Dict[str, Asset] = {}
+    for src in sorted(static_dir.rglob('*')):
+        if not src.is_file() or dist in src.parents or src.name.startswith('.'):
+            continue
+        source = src.relative_to(static_dir).as_posix()
+        stat = src.stat()
+        old = previous.get(source)
+        if (old is not None and (old.mtime_ns, old.size) == (stat.st_mtime_ns, stat.st_size)
+                and (dist / old.path).exists()):
+            manifest[source] = old
+        else:
+            manifest[source] = _build_asset(static_dir, dist, source)
+    _write_atomic(dist / MANIFEST_NAME, json.dumps(
+        {source: asset._asdict() for source, asset in manifest.items()}, indent=1).encode('utf-8'))
+    _prune(dist, manifest, previous)
+    return manifest
+
+
+def _prune(dist: Path, manifest: Dict[str, Asset], previous: Dict[str, Asset]):
+    """Delete hashed files from older builds, keeping the current and the previous one.
+
+    Pages rendered just before a deploy may still reference the previous hashes.
+    """
+    keep = {asset.path for asset in manifest.values()} | {asset.path for asset in previous.values()}
+    for path in dist.rglob('*'):
+        if not path.is_file() or path.name == MANIFEST_NAME:
+            continue
+        relative = path.relative_to(dist).as_posix()
+        for _, suffix in ENCODINGS:
+            if relative.endswith(suffix):
+                relative = relative[:-len(suffix)]
+                break
+        # Temp files are left alone: another worker may be mid-build
+        if '.tmp' not in path.name and relative not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def load_manifest(static_dir='static') -> Dict[str, Asset]:
+    path = Path(static_dir) / DIST_NAME / MANIFEST_NAME
+    try:
+        entries = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return {source: Asset(**dict(entry, encodings=tuple(entry['encodings'])))
+            for source, entry in entries.items()}
+
+
+class HashedFile(NamedTuple):
+    path: Path
+    etag: str
+    mimetype: Optional[str]
+    encoding: Optional[str]
+
+
+def resolve(static_dir, hashed_path: str, accepted) -> Optional[HashedFile]:
+    """The file to send for a hashed path, in the best encoding the client accepts.
+
+    The strong ETag is the content hash in the file name plus the encoding, so any worker
+    can answer conditional requests without reading the file.
+    """
+    dist = (Path(static_dir) / DIST_NAME).resolve()
+    path = (dist / hashed_path).resolve()
+    match = _HASHED_NAME.match(path.name)
+    if match is None or dist not in path.parents or not path.is_file():
+        return None
+    mimetype = mimetypes.guess_type(path.name)[0]
+    for encoding, suffix in ENCODINGS:
+        variant = path.with_name(path.name + suffix)
+        if encoding in accepted and variant.is_file():
+            return HashedFile(variant, f"{match.group('hash')}-{encoding}", mimetype, encoding)
+    return HashedFile(path, match.group('hash'), mimetype, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static', default='static')
+    args = parser.parse_args()
+    manifest = build(args.static)
+    for asset in manifest.values():
+        size = Path(args.static, DIST_NAME, asset.path).stat().st_size
+        variants = ', '.join(
+            f"{encoding} {Path(args.static, DIST_NAME, asset.path + suffix).stat().st_size:,}"
+            for encoding, suffix in ENCODINGS if encoding in asset.encodings)
+        print(f"{asset.source:<24} -> {asset.path:<36} {size:>8,} B  {variants}")
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were built")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark the forecast engine: model unpickling time and prediction latency.
+
+Prediction latency is measured three ways for each indicator: one call per year (what a
+loop over horizons would cost), every year in one vectorized call, and the same request
+again once memoized. Models whose library is not installed are reported and benchmarked
+through the trend fallback the engine uses in their place.
+
+Usage: python benchmarks/bench_forecast.py [--years 2025-2100] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chat import FEATURES_STORE, NUMERIC_COLUMNS  # noqa: E402
+from dataset_index import DatasetIndex  # noqa: E402
+from feature_store import read_store  # noqa: E402
+from forecast import FORECAST_INDICATORS, ForecastEngine  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', default='2025-2100', help='first-last forecast year')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    first, last = (int(y) for y in args.years.split('-'))
+    years = list(range(first, last + 1))
+
+    os.chdir(ROOT)
+    store = read_store(FEATURES_STORE)
+    numeric = [c for c in NUMERIC_COLUMNS if c in store.columns]
+    frame = store.frame()
+    index = DatasetIndex.from_arrays(numeric, frame[numeric].to_numpy(), store.columns['year'],
+                                     store.columns.get('month'))
+
+    engine = ForecastEngine(os.path.join(ROOT, 'models'))
+    start = time.perf_counter()
+    engine.wait_until_loaded()
+    print(f"model loading (background thread): {(time.perf_counter() - start) * 1000:.1f} ms total")
+    for indicator in FORECAST_INDICATORS.values():
+        if indicator.model_file is None:
+            continue
+        size = os.path.getsize(os.path.join(ROOT, 'models', indicator.model_file)) / 1024
+        if indicator.name in engine.load_seconds:
+            print(f"  {indicator.model_file:<28} {size:6.0f} KB  unpickled in {engine.load_seconds[indicator.name] * 1000:.1f} ms")
+        else:
+            print(f"  {indicator.model_file:<28} {size:6.0f} KB  unavailable ({engine.load_errors.get(indicator.name)})")
+
+    print(f"\n{len(years)} horizons, {years[0]}-{years[-1]}; median of {args.repeat} runs")
+    print(f"{'indicator':<14} {'method':<30} {'per-year calls':>15} {'one call':>10} {'memoized':>10}")
+    # A fresh dataset version for every run keeps the memo from answering the cold cases
+    version = iter(range(1, 10 ** 9))
+    for name in FORECAST_INDICATORS:
+        method = engine.forecast(name, years[:1], next(version), index).method
+        per_year = timed(lambda: [engine.forecast(name, [y], v, index) for v in [next(version)] for y in years],
+                         args.repeat)
+        vectorized = timed(lambda: engine.forecast(name, years, next(version), index), args.repeat)
+        warm = next(version)
+        engine.forecast(name, years, warm, index)
+        memoized = timed(lambda: engine.forecast(name, years, warm, index), args.repeat)
+        print(f"{name:<14} {method:<30} {per_year:12.2f} ms {vectorized:7.2f} ms {memoized:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark chat history loading for a user with many messages: full load vs. keyset pages.
+
+Usage: python benchmarks/bench_history.py [--messages 100000] [--page-size 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from models import db, ChatMessage, User
+
+
+def make_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    return app
+
+
+def seed(n_messages, heavy_user=1, other_users=20):
+    db.session.add_all(User(id=i, username=f'user{i}', email=f'user{i}@example.com', password_hash='x')
+                       for i in range(1, other_users + 2))
+    db.session.commit()
+    start = datetime(2020, 1, 1)
+    rows = []
+    for i in range(n_messages):
+        rows.append({'user_id': heavy_user, 'user_message': f'question {i}',
+                     'bot_response': 'Current atmospheric CO₂: 420.00 ppm.', 'sources': '["NASA"]',
+                     'timestamp': start + timedelta(seconds=i)})
+        # Interleave other users' traffic so the heavy user's rows are not contiguous
+        rows.append({'user_id': 2 + i % other_users, 'user_message': 'hi', 'bot_response': 'hello',
+                     'sources': '[]', 'timestamp': start + timedelta(seconds=i)})
+    db.session.execute(db.insert(ChatMessage), rows)
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def full_history(user_id):
+    return ChatMessage.query.filter_by(user_id=user_id).order_by(ChatMessage.timestamp.asc()).all()
+
+
+def keyset_page(user_id, before, limit):
+    query = ChatMessage.query.filter(ChatMessage.user_id == user_id)
+    if before is not None:
+        timestamp, message_id = before
+        query = query.filter(ChatMessage.timestamp <= timestamp,
+                             db.or_(ChatMessage.timestamp < timestamp, ChatMessage.id < message_id))
+    return query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc()).limit(limit).all()
+
+
+def run(label, n_messages, page_size, with_index):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = make_app(path)
+    with app.app_context():
+        db.create_all()
+        if not with_index:
+            db.session.execute(db.text('DROP INDEX ix_chat_message_user_id_timestamp'))
+            db.session.commit()
+        seed(n_messages)
+        full_ms, rows = timed(lambda: full_history(1), 3)
+        db.session.expunge_all()
+        first_ms, page = timed(lambda: keyset_page(1, None, page_size), 20)
+        middle = rows[len(rows) // 2]
+        deep_ms, _ = timed(lambda: keyset_page(1, (middle.timestamp, middle.id), page_size), 20)
+        print(f"{label}:")
+        print(f"  full history ({len(rows)} rows):     {full_ms:9.2f} ms")
+        print(f"  latest page ({len(page)} rows):          {first_ms:9.2f} ms")
+        print(f"  keyset page at row {len(rows) // 2}:       {deep_ms:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+    run('without (user_id, timestamp) index', args.messages, args.page_size, with_index=False)
+    run('with (user_id, timestamp) index', args.messages, args.page_size, with_index=True)
+
+
+if __name__ == '__main__':
+    main()
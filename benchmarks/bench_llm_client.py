@@ -0,0 +1,67 @@
+"""Exercise CohereClient against the local stand-in: pooled vs. bare requests, retries and breaker.
+
+Usage: python benchmarks/bench_llm_client.py [--calls N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from benchmarks.fake_cohere import FakeCohereServer
+from llm_client import CircuitBreaker, CohereClient
+
+PAYLOAD = {'model': 'command', 'prompt': 'What causes climate change?', 'max_tokens': 50}
+
+
+def time_calls(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    with FakeCohereServer() as server:
+        client = CohereClient(server.url, {}, read_timeout=1.0, backoff=0.05,
+                              breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.5))
+        bare_ms = time_calls(lambda: requests.post(server.url, json=PAYLOAD, timeout=15).json(), args.calls)
+        pooled_ms = time_calls(lambda: client.generate(PAYLOAD), args.calls)
+        print(f"bare requests.post:     {bare_ms:6.2f} ms/call")
+        print(f"pooled CohereClient:    {pooled_ms:6.2f} ms/call")
+
+        # Failing upstream: retries, then the breaker opens and fails fast
+        server.fail_rate = 1.0
+        for i in range(5):
+            start = time.perf_counter()
+            try:
+                client.generate(PAYLOAD)
+            except requests.exceptions.RequestException as e:
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"failing call {i + 1}: {type(e).__name__:<17} breaker={client.breaker.state:<9} {elapsed:7.1f} ms")
+
+        # Recovery through the half-open trial call
+        server.fail_rate = 0.0
+        time.sleep(client.breaker.reset_timeout)
+        client.generate(PAYLOAD)
+        print(f"after reset timeout: breaker={client.breaker.state}")
+
+        # Slow upstream: read timeout bounds the time a worker is pinned
+        server.latency = 2.0
+        start = time.perf_counter()
+        try:
+            client.generate(PAYLOAD)
+        except requests.exceptions.Timeout:
+            print(f"slow upstream: timed out after {time.perf_counter() - start:.2f} s")
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark /login throughput under a burst of concurrent users, hashing inline vs. in the process pool.
+
+While the logins run, a probe thread keeps requesting a cheap page so the report also
+shows how responsive the other request threads stay during the spike.
+
+Usage: python benchmarks/bench_login.py [--users 32] [--logins 4] [--workers N]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'login.db'))
+os.environ.setdefault('RESPONSE_CACHE_DB', os.path.join(tempfile.mkdtemp(), 'response_cache.db'))
+
+import requests
+from werkzeug.serving import make_server
+
+import app as app_module
+from app import app
+from models import db, User
+from benchmarks.load_chat_persistence import percentile
+
+
+def setup_users(n_users):
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        # Production-cost hash, so the benchmark exercises the real KDF
+        password_hash = app_module.password_hasher.hash('password123')
+        for i in range(n_users):
+            if not User.query.filter_by(email=f'login{i}@example.com').first():
+                db.session.add(User(username=f'login{i}', email=f'login{i}@example.com', password_hash=password_hash))
+        db.session.commit()
+
+
+def run_burst(base_url, n_users, n_logins):
+    latencies, probes = [], []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def user(i):
+        local = []
+        for _ in range(n_logins):
+            session = requests.Session()
+            start = time.perf_counter()
+            response = session.post(f'{base_url}/login', allow_redirects=False,
+                                    data={'email': f'login{i}@example.com', 'password': 'password123'})
+            local.append(time.perf_counter() - start)
+            if response.status_code != 302:
+                raise RuntimeError(f'login failed with {response.status_code}')
+        with lock:
+            latencies.extend(local)
+
+    def probe():
+        session = requests.Session()
+        while not done.is_set():
+            start = time.perf_counter()
+            session.get(f'{base_url}/login')
+            probes.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(n_users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    prober.join()
+    return latencies, probes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=None, help='pool size (default: CPU count)')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    hasher = app_module.password_hasher
+    setup_users(args.users)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    for label, workers in [('inline hashing', 0), ('process pool', args.workers)]:
+        hasher.shutdown()
+        hasher.workers = workers
+        latencies, probes, elapsed = run_burst(base_url, args.users, args.logins)
+        ms = [l * 1000 for l in latencies]
+        probe_ms = [p * 1000 for p in probes]
+        print(f"{label:<15} n={len(ms):<4} {len(ms) / elapsed:6.1f} logins/s  "
+              f"p50={percentile(ms, 50):7.1f} ms  p95={percentile(ms, 95):7.1f} ms  "
+              f"| probe p95={percentile(probe_ms, 95):6.1f} ms")
+    hasher.shutdown()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark year-range aggregates: filtering the rows per query vs. the index's prefix tables.
+
+The baseline is what a handler would do without the index: select the rows of the window
+and take mean/sum/min/max of the yearly means. DatasetIndex.range_stats answers the same
+from prefix sums and sparse min/max tables, so its cost does not grow with the window.
+
+Usage: python benchmarks/bench_range.py [--years 200] [--rows-per-year 12] [--queries 2000]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dataset_index import DatasetIndex  # noqa: E402
+
+
+def filtered_stats(values, row_years, col, start, end):
+    rows = (row_years >= start) & (row_years <= end)
+    years, groups = np.unique(row_years[rows], return_inverse=True)
+    means = np.bincount(groups, values[rows, col]) / np.bincount(groups)
+    return means.mean(), means.sum(), means.min(), means.max(), means[-1] - means[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=200)
+    parser.add_argument('--rows-per-year', type=int, default=12)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    row_years = np.repeat(np.arange(1850, 1850 + args.years), args.rows_per_year)
+    columns = ['a', 'b', 'c', 'd']
+    values = rng.normal(size=(len(row_years), len(columns))).cumsum(axis=0)
+    start = time.perf_counter()
+    index = DatasetIndex.from_arrays(columns, values, row_years)
+    print(f"{len(row_years):,} rows, {args.years} years: index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    windows = np.sort(rng.integers(1850, 1850 + args.years, size=(args.queries, 2)), axis=1)
+    cols = rng.integers(0, len(columns), size=args.queries)
+    for (lo, hi), col in zip(windows[:50], cols[:50]):
+        stats = index.range_stats(columns[col], int(lo), int(hi))
+        expected = filtered_stats(values, row_years, col, lo, hi)
+        assert np.allclose([stats.mean, stats.sum, stats.min, stats.max, stats.change], expected)
+
+    start = time.perf_counter()
+    for (lo, hi), col in zip(windows, cols):
+        filtered_stats(values, row_years, col, lo, hi)
+    filtered_us = (time.perf_counter() - start) / args.queries * 1e6
+    start = time.perf_counter()
+    for (lo, hi), col in zip(windows, cols):
+        index.range_stats(columns[col], int(lo), int(hi))
+    indexed_us = (time.perf_counter() - start) / args.queries * 1e6
+    print(f"filter rows per query:  {filtered_us:8.1f} us/query")
+    print(f"prefix/sparse tables:   {indexed_us:8.1f} us/query  ({filtered_us / indexed_us:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Micro-benchmark: per-query routing cost of QueryRouter vs. the previous multi-scan routing.
+
+Usage: python benchmarks/bench_router.py [--repeat N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query_router import DATA_WORDS, EXAMPLE_WORDS, INTENT_PATTERNS, QueryRouter
+
+CORPUS = [
+    "What was the CO2 level in 2001?",
+    "carbon dioxide concentration during 2002",
+    "How much has the temperature risen?",
+    "global warming trend since 2010",
+    "what is the temp_anomaly in 2002",
+    "sea level rise in 2001",
+    "Is the GMSL still going up?",
+    "How much forest was lost in 2002?",
+    "deforestation statistics",
+    "ocean acidification data",
+    "what's the ocean pH right now",
+    "ozone layer status",
+    "rainfall anomaly in 2001",
+    "precipitation trend",
+    "arctic ice extent in 2002",
+    "sea ice decline",
+    "show historical trends",
+    "latest environmental data",
+    "what are the current numbers",
+    "compare 2001 and 2002",
+    "what is the difference between 2001 and 2002 temperature",
+    "What causes climate change?",
+    "Explain the greenhouse effect with an example",
+    "give me a detailed explanation of carbon sinks",
+    "how do renewable energy sources help?",
+    "what can I do to reduce my carbon footprint",
+    "Elaborate on the impact of plastics on marine life",
+    "what is biodiversity",
+    "why are coral reefs bleaching",
+    "how does air pollution affect health",
+]
+
+
+def legacy_route(query):
+    """The routing work get_response/_try_dataset_response/_extract_year used to do"""
+    wants_examples = any(word in query for word in EXAMPLE_WORDS)
+    wants_data = any(word in query for word in DATA_WORDS)
+    year_match = re.search(r'(?:year|in|during|since)\s*(\d{4})', query)
+    year = int(year_match.group(1)) if year_match else None
+    intents = tuple(name for name, pattern in INTENT_PATTERNS if re.search(pattern, query, re.IGNORECASE))
+    years = tuple(int(y) for y in re.findall(r'\d{4}', query))
+    return intents, year, years, wants_examples, wants_data
+
+
+def new_route(router, query):
+    route = router.route(query)
+    return route.intents, route.year, route.years, route.wants_examples, route.wants_data
+
+
+def bench(fn, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    router = QueryRouter()
+    queries = [q.lower().strip() for q in CORPUS]
+
+    mismatches = [q for q in queries if legacy_route(q) != new_route(router, q)]
+    for query in mismatches:
+        print(f"MISMATCH {query!r}: legacy={legacy_route(query)} new={new_route(router, query)}")
+
+    legacy_us = bench(legacy_route, queries, args.repeat)
+    router_us = bench(router.route, queries, args.repeat)
+    print(f"corpus: {len(queries)} queries x {args.repeat} repeats")
+    print(f"legacy multi-scan routing: {legacy_us:8.2f} us/query")
+    print(f"compiled QueryRouter:      {router_us:8.2f} us/query  ({legacy_us / router_us:.1f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
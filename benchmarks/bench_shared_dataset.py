@@ -0,0 +1,106 @@
+"""Benchmark worker memory with a private dataset per process vs. one shared publication.
+
+Starts N worker processes over a synthetic features table of --rows rows, waits until all
+of them have loaded it and answered a question, then reads each one's /proc smaps_rollup
+(Linux only). PSS splits shared pages between the processes mapping them, so the PSS sum
+is the real footprint of the whole pool.
+
+Usage: python benchmarks/bench_shared_dataset.py [--workers 4] [--rows 1000000]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chat import FEATURES_STORE, NUMERIC_COLUMNS  # noqa: E402
+from feature_store import write_store  # noqa: E402
+
+CHILD = '''
+import json, sys
+sys.path.insert(0, {root!r})
+import chat
+expert = chat.EnvironmentalExpert()
+answer = expert.get_dataset_response('co2 in 2001')
+memory = {{}}
+with open('/proc/self/smaps_rollup') as f:
+    for line in f:
+        key, _, value = line.partition(':')
+        if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+            memory[key] = int(value.split()[0])
+print(json.dumps(dict(memory, answer=answer, version=expert.dataset_status()['version'])), flush=True)
+sys.stdin.readline()
+'''
+
+
+def write_features(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    months = np.arange(rows)
+    columns = {'year': (2001 + months // 12 % 100).astype(np.int32),
+               'month': (months % 12 + 1).astype(np.int8)}
+    for name in NUMERIC_COLUMNS:
+        columns[name] = rng.normal(100.0, 10.0, rows)
+    write_store(path, columns, {'synthetic_rows': rows})
+
+
+def read_report(proc):
+    # Skip whatever the app prints at startup
+    for line in proc.stdout:
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError("worker exited without reporting")
+
+
+def run_pool(workers, cwd, env):
+    procs = [subprocess.Popen([sys.executable, '-c', CHILD.format(root=ROOT)], cwd=cwd, env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True)
+             for _ in range(workers)]
+    try:
+        # Every worker stays alive until all have reported, so shared pages are split fairly
+        return [read_report(p) for p in procs]
+    finally:
+        for p in procs:
+            p.communicate('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit("needs Linux /proc/<pid>/smaps_rollup")
+
+    tmp = tempfile.mkdtemp()
+    write_features(os.path.join(tmp, FEATURES_STORE), args.rows)
+    base_env = dict(os.environ, DATASET_SNAPSHOT='', DATASET_RELOAD_INTERVAL='0',
+                    RESPONSE_CACHE_DB=os.path.join(tmp, 'response_cache.db'))
+    shm = '/dev/shm' if os.path.isdir('/dev/shm') else tmp
+    shared_dir = os.path.join(shm, f'bench-dataset-{os.getpid()}')
+    scenarios = [
+        ('private copies', dict(base_env, DATASET_SHARED_DIR='')),
+        ('shared', dict(base_env, DATASET_SHARED_DIR=shared_dir)),
+    ]
+    data_mb = args.rows * len(NUMERIC_COLUMNS) * 8 / 2 ** 20
+    print(f"{args.workers} workers, {args.rows:,} rows ({data_mb:.0f} MB of numeric columns)")
+    print(f"{'mode':<16} {'RSS/worker':>11} {'PSS/worker':>11} {'private/worker':>15} {'PSS total':>10}")
+    for label, env in scenarios:
+        stats = run_pool(args.workers, tmp, env)
+        assert len({s['answer'] for s in stats}) == 1, "workers disagree"
+        mean = {key: sum(s[key] for s in stats) / len(stats) / 1024
+                for key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')}
+        private = mean['Private_Clean'] + mean['Private_Dirty']
+        print(f"{label:<16} {mean['Rss']:8.1f} MB {mean['Pss']:8.1f} MB {private:12.1f} MB "
+              f"{mean['Pss'] * len(stats):7.1f} MB")
+    shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark cold start: importing the app and answering the first dataset question, eager vs. lazy.
+
+Each scenario runs in fresh interpreters. "eager (before)" reproduces the old startup:
+chat imported with the app and the expert built at import time from features.csv, no snapshot.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+t0 = time.perf_counter()
+import app
+{eager}
+t1 = time.perf_counter()
+{answer}
+t2 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'first_answer': t2 - t1, 'pandas': 'pandas' in sys.modules}}))
+'''
+
+EAGER = '''import chat
+chat.FEATURES_STORE = '(none)'
+expert = chat.EnvironmentalExpert()'''
+
+SCENARIOS = [
+    # label, eager setup, first answer, snapshot enabled, remove snapshot first
+    ('eager (before)', EAGER, "expert.get_dataset_response('co2 in 2001')", False, True),
+    ('lazy, cold snapshot', '', "app.get_expert().get_dataset_response('co2 in 2001')", True, True),
+    ('lazy, warm snapshot', '', "app.get_expert().get_dataset_response('co2 in 2001')", True, False),
+    ('import only', '', '', True, False),
+]
+
+
+def run_child(code, env):
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    snapshot = os.path.join(tmp, 'dataset_snapshot.npz')
+    base_env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                    RESPONSE_CACHE_DB=os.path.join(tmp, 'response_cache.db'))
+    print(f"{'scenario':<22} {'import app':>11} {'first answer':>13} {'total':>9}  pandas loaded")
+    for label, eager, answer, use_snapshot, cold in SCENARIOS:
+        env = dict(base_env, DATASET_SNAPSHOT=snapshot if use_snapshot else '')
+        samples = []
+        for _ in range(args.runs):
+            if cold and os.path.exists(snapshot):
+                os.remove(snapshot)
+            samples.append(run_child(CHILD.format(eager=eager, answer=answer), env))
+        imp = statistics.median(s['import'] for s in samples) * 1000
+        first = statistics.median(s['first_answer'] for s in samples) * 1000
+        print(f"{label:<22} {imp:9.1f} ms {first:10.1f} ms {imp + first:6.1f} ms  {samples[-1]['pandas']}")
+
+
+if __name__ == '__main__':
+    main()
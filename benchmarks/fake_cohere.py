@@ -0,0 +1,128 @@
+"""Local stand-in for the Cohere generate endpoint with tunable latency and failures.
+
+Usage: python benchmarks/fake_cohere.py [--port 8081] [--latency 0.2] [--fail-rate 0.0] [--token-delay 0.02]
+Then point the app at it with COHERE_API_URL=http://127.0.0.1:8081/v1/generate
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import threading
+import time
+
+DEFAULT_TEXT = ("Climate change is mainly driven by greenhouse gas emissions from burning fossil fuels. "
+                "These gases trap heat and warm the planet.")
+
+
+class FakeCohereServer:
+    """Threaded HTTP server answering POST /v1/generate like Cohere does, including streaming"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 fail_rate: float = 0.0, fail_status: int = 503, text: str = DEFAULT_TEXT,
+                 token_delay: float = 0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.text = text
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/generate"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.fail_rate and random.random() < server.fail_rate:
+                    self._send_json(server.fail_status, {'message': 'simulated upstream failure'})
+                    return
+                if body.get('stream'):
+                    self._send_stream(server.text)
+                    return
+                self._send_json(200, {'id': 'fake', 'generations': [{'id': 'fake-0', 'text': server.text}]})
+
+            def _send_json(self, status, data):
+                payload = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_stream(self, text):
+                # Cohere streams newline-delimited JSON events, one per token
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/stream+json')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for token in text.split(' '):
+                    event = json.dumps({'text': token + ' ', 'is_finished': False}) + '\n'
+                    self._write_chunk(event.encode('utf-8'))
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                done = json.dumps({'is_finished': True, 'finish_reason': 'COMPLETE'}) + '\n'
+                self._write_chunk(done.encode('utf-8'))
+                self.wfile.write(b'0\r\n\r\n')
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--fail-status', type=int, default=503)
+    parser.add_argument('--token-delay', type=float, default=0.02)
+    args = parser.parse_args()
+    server = FakeCohereServer(port=args.port, latency=args.latency,
+                              fail_rate=args.fail_rate, fail_status=args.fail_status,
+                              token_delay=args.token_delay)
+    print(f"Fake Cohere listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Local fixture HTTP server for the ETL fetch stage, with ETag/Last-Modified revalidation.
+
+Usage: python benchmarks/fixture_http.py [--port 8082] [--directory data] [--latency 0.2] [--fail-first 0]
+Serves every file in the directory at /<filename>; point etl SOURCES at it to run offline.
+"""
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+import argparse
+import hashlib
+import threading
+import time
+
+
+class FixtureHTTPServer:
+    """Threaded HTTP server for static fixtures that answers conditional GETs with 304.
+
+    fail_first makes the first N requests for each path return fail_status, to exercise backoff.
+    """
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, fail_first: int = 0, fail_status: int = 503):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self._files = {}
+        self._lock = threading.Lock()
+        self.request_counts: Dict[str, int] = {}
+        self.not_modified = 0
+        for path, content in (files or {}).items():
+            self.set_file(path, content)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    def set_file(self, path: str, content: bytes, modified: Optional[float] = None):
+        """Publish (or replace) a fixture; a new body gets a new ETag"""
+        etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+        with self._lock:
+            self._files['/' + path.lstrip('/')] = (content, etag, int(modified or time.time()))
+
+    def url(self, path: str) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/{path.lstrip('/')}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    count = server.request_counts[self.path] = server.request_counts.get(self.path, 0) + 1
+                    entry = server._files.get(self.path)
+                if server.latency:
+                    time.sleep(server.latency)
+                if count <= server.fail_first:
+                    self._send(server.fail_status, b'simulated failure')
+                    return
+                if entry is None:
+                    self._send(404, b'not found')
+                    return
+                content, etag, modified = entry
+                if self._not_modified(etag, modified):
+                    with server._lock:
+                        server.not_modified += 1
+                    self._send(304, b'', etag, modified)
+                    return
+                self._send(200, content, etag, modified)
+
+            def _not_modified(self, etag, modified):
+                # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match is not None:
+                    return etag in [tag.strip() for tag in if_none_match.split(',')]
+                if_modified_since = self.headers.get('If-Modified-Since')
+                if if_modified_since:
+                    try:
+                        return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+                    except (TypeError, ValueError):
+                        return False
+                return False
+
+            def _send(self, status, content, etag=None, modified=None):
+                self.send_response(status)
+                if etag is not None:
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', formatdate(modified, usegmt=True))
+                if status != 304:
+                    self.send_header('Content-Type', 'text/csv')
+                    self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(content)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--directory', default='data')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--fail-first', type=int, default=0)
+    args = parser.parse_args()
+    files = {path.name: path.read_bytes() for path in Path(args.directory).glob('*') if path.is_file()}
+    server = FixtureHTTPServer(files, port=args.port, latency=args.latency, fail_first=args.fail_first)
+    print(f"Serving {len(files)} fixtures from {args.directory} at {server.url('')}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Load test /api/chat latency with write-behind ChatMessage persistence on and off.
+
+Runs the app on a local threaded server against a throwaway SQLite database and
+sends dataset-answerable questions (no upstream calls) from concurrent users.
+
+Usage: python benchmarks/load_chat_persistence.py [--users 16] [--requests 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load.db'))
+os.environ.setdefault('RESPONSE_CACHE_DB', os.path.join(tempfile.mkdtemp(), 'response_cache.db'))
+
+import requests
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+from app import app, chat_writer
+from models import db, ChatMessage, User
+
+QUESTIONS = ['co2 in 2001', 'temperature in 2002', 'sea level', 'latest data', 'compare 2001 and 2002']
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def setup_users(n_users):
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        # Cheap hash parameters: this test measures chat persistence, not login
+        password_hash = generate_password_hash('password123', method='pbkdf2:sha256:1')
+        for i in range(n_users):
+            if not User.query.filter_by(email=f'load{i}@example.com').first():
+                db.session.add(User(username=f'load{i}', email=f'load{i}@example.com', password_hash=password_hash))
+        db.session.commit()
+
+
+def run_users(base_url, n_users, n_requests):
+    latencies = []
+    lock = threading.Lock()
+
+    def user(i):
+        session = requests.Session()
+        session.post(f'{base_url}/login', data={'email': f'load{i}@example.com', 'password': 'password123'})
+        local = []
+        for j in range(n_requests):
+            start = time.perf_counter()
+            response = session.post(f'{base_url}/api/chat', json={'message': QUESTIONS[j % len(QUESTIONS)]})
+            local.append(time.perf_counter() - start)
+            response.raise_for_status()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(n_users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    setup_users(args.users)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    for label, write_behind in [('per-message commit', False), ('write-behind batches', True)]:
+        app.config['CHAT_WRITE_BEHIND'] = write_behind
+        latencies, elapsed = run_users(base_url, args.users, args.requests)
+        chat_writer.flush()
+        ms = [l * 1000 for l in latencies]
+        print(f"{label:<22} n={len(ms):<5} {len(ms) / elapsed:7.1f} req/s  "
+              f"p50={percentile(ms, 50):6.1f} ms  p95={percentile(ms, 95):6.1f} ms  p99={percentile(ms, 99):6.1f} ms")
+    with app.app_context():
+        print(f"rows persisted: {ChatMessage.query.count()}  writer: {chat_writer.stats()}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
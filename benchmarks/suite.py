@@ -0,0 +1,322 @@
+"""Benchmark suite with JSON baselines: expert micro-benchmarks and an end-to-end load test.
+
+micro: EnvironmentalExpert.get_response for one question per dataset intent, the trend
+       lookup (_calculate_trend) and a full dataset reload, each call timed on its own.
+load:  concurrent users against the app on a local threaded server, with model-backed
+       questions answered by benchmarks/fake_cohere.py at a fixed --latency:
+       POST /login, GET /chat and POST /api/chat (a --model-ratio share of unique
+       questions goes upstream, the rest are dataset answers).
+
+Every case reports throughput and p50/p95/p99 latency. --save-baseline writes them to
+--baseline; otherwise they are compared against it and the run fails (exit status 1)
+when a case's p50 or p95 grew, or its throughput fell, by more than --threshold
+(latency growth under --min-delta-ms is treated as timer noise).
+Baselines are only comparable on the same machine and settings, so the file records both.
+
+Usage: python benchmarks/suite.py [--groups micro,load] [--users 8] [--requests 25]
+                                  [--latency 0.05] [--save-baseline] [--threshold 0.25]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+# Throwaway databases and snapshot, and a dataset that stays put while we measure
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(_tmp, 'suite.db'))
+os.environ.setdefault('RESPONSE_CACHE_DB', os.path.join(_tmp, 'response_cache.db'))
+os.environ.setdefault('DATASET_SNAPSHOT', os.path.join(_tmp, 'dataset_snapshot.npz'))
+os.environ.setdefault('DATASET_RELOAD_INTERVAL', '0')
+os.environ.setdefault('DATASET_SHARED_DIR', '')
+
+from benchmarks.fake_cohere import FakeCohereServer  # noqa: E402
+from benchmarks.load_chat_persistence import percentile  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+# One dataset-answerable question per router intent; each must route to its intent first
+INTENT_QUESTIONS = {
+    'forecast': 'forecast co2 for 2040',
+    'range': 'average temperature between 2005 and 2015',
+    'co2': 'co2 in 2010',
+    'temperature': 'temperature in 2015',
+    'sea_level': 'sea level in 2012',
+    'forest': 'forest loss in 2010',
+    'ocean': 'ocean acidification in 2018',
+    'ozone': 'ozone in 2005',
+    'precipitation': 'rainfall in 2016',
+    'sea_ice': 'sea ice in 2012',
+    'trend': 'show environmental trends',
+    'current': 'latest data',
+    'comparison': 'compare 2005 and 2015',
+}
+DATASET_QUESTIONS = ['co2 in 2001', 'temperature in 2002', 'sea level', 'latest data', 'compare 2001 and 2002',
+                     'total forest loss since 2010']
+MODEL_QUESTIONS = ['what is biodiversity', 'why are coral reefs bleaching', 'how does air pollution affect health']
+
+
+def summarize(samples, elapsed):
+    """Throughput and latency percentiles (ms) of per-call durations in seconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        'n': len(ms),
+        'throughput': round(len(ms) / elapsed, 2),
+        'p50': round(percentile(ms, 50), 4),
+        'p95': round(percentile(ms, 95), 4),
+        'p99': round(percentile(ms, 99), 4),
+    }
+
+
+def time_calls(fn, iterations, warmup=5):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return summarize(samples, time.perf_counter() - start)
+
+
+def micro_benchmarks(iterations):
+    from chat import DATASET_SOURCES, EnvironmentalExpert
+    expert = EnvironmentalExpert()
+    missing = set(expert.dataset_queries) - set(INTENT_QUESTIONS)
+    if missing:
+        raise SystemExit(f"no benchmark question for intents: {', '.join(sorted(missing))}")
+    # Forecasts wait for the models on first use; measure answers, not the one-off load
+    expert.forecaster.wait_until_loaded()
+
+    results = {}
+    for intent, question in INTENT_QUESTIONS.items():
+        routed = expert.router.route(question).intents
+        if not routed or routed[0] != intent:
+            raise SystemExit(f"{question!r} routes to {routed}, not {intent}")
+        expert.get_response(question)
+        if set(expert.get_last_sources()) != set(DATASET_SOURCES):
+            raise SystemExit(f"{question!r} was not answered from the dataset")
+        results[f'get_response.{intent}'] = time_calls(lambda: expert.get_response(question), iterations)
+
+    # Trends are per year: CO₂ has risen by about 2 ppm a year since 2000
+    co2_trend = expert._calculate_trend('co2', 2000)
+    if not 1.5 <= co2_trend <= 3.0:
+        raise SystemExit(f"CO₂ trend since 2000 is {co2_trend:.3f} ppm/year, expected about 2")
+    last_year = expert.index.last_year
+    results['calculate_trend.all_years'] = time_calls(lambda: expert._calculate_trend('co2'), iterations)
+    results['calculate_trend.since'] = time_calls(lambda: expert._calculate_trend('co2', last_year - 10), iterations)
+    results['dataset.reload'] = time_calls(expert.reload_dataset, max(iterations // 4, 20), warmup=1)
+    return results
+
+
+def setup_users(app, n_users):
+    import app as app_module
+    from models import db, User
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        # Production-cost hash, so /login exercises the real KDF
+        password_hash = app_module.password_hasher.hash('password123')
+        for i in range(n_users):
+            if not User.query.filter_by(email=f'suite{i}@example.com').first():
+                db.session.add(User(username=f'suite{i}', email=f'suite{i}@example.com', password_hash=password_hash))
+        db.session.commit()
+
+
+def run_load(n_users, n_requests, request_fn):
+    """n_users threads each making n_requests calls of request_fn(user, session, j)"""
+    import requests
+    samples, errors = [], []
+    lock = threading.Lock()
+    ready = threading.Barrier(n_users + 1)
+
+    def user(i):
+        session = requests.Session()
+        local = []
+        try:
+            request_fn(i, session, None)
+        except Exception as e:
+            errors.append(e)
+        ready.wait()
+        for j in range(n_requests):
+            t = time.perf_counter()
+            try:
+                request_fn(i, session, j)
+            except Exception as e:
+                errors.append(e)
+            local.append(time.perf_counter() - t)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(n_users)]
+    for t in threads:
+        t.start()
+    # Sessions are logged in (j=None) before the clock starts
+    ready.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    if errors:
+        raise RuntimeError(f"{len(errors)} failed requests, first: {errors[0]}")
+    return summarize(samples, time.perf_counter() - start)
+
+
+def load_benchmarks(users, n_requests, login_requests, latency, model_ratio, seed):
+    from werkzeug.serving import make_server
+    import app as app_module
+    app = app_module.app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    with FakeCohereServer(latency=latency) as cohere:
+        os.environ['COHERE_API_URL'] = cohere.url
+        setup_users(app, users)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+
+        def login(i, session, j):
+            if j is None:
+                return
+            response = session.post(f'{base}/login', allow_redirects=False,
+                                    data={'email': f'suite{i}@example.com', 'password': 'password123'})
+            if response.status_code != 302:
+                raise RuntimeError(f'login returned {response.status_code}')
+            session.cookies.clear()
+
+        def logged_in(fn):
+            def request(i, session, j):
+                if j is None:
+                    session.post(f'{base}/login', data={'email': f'suite{i}@example.com', 'password': 'password123'})
+                    return
+                fn(i, session, j)
+            return request
+
+        @logged_in
+        def chat_page(i, session, j):
+            session.get(f'{base}/chat').raise_for_status()
+
+        # The same question mix on every run; model questions are unique so none is served from cache
+        rng = random.Random(seed)
+        mix = [rng.random() < model_ratio for _ in range(users * n_requests)]
+
+        @logged_in
+        def api_chat(i, session, j):
+            if mix[i * n_requests + j]:
+                message = f"{MODEL_QUESTIONS[j % len(MODEL_QUESTIONS)]} (run {seed}, user {i}, #{j})"
+            else:
+                message = DATASET_QUESTIONS[(i + j) % len(DATASET_QUESTIONS)]
+            response = session.post(f'{base}/api/chat', json={'message': message})
+            response.raise_for_status()
+            if 'response' not in response.json():
+                raise RuntimeError(response.text)
+
+        results = {}
+        results['load.login'] = run_load(users, login_requests, login)
+        results['load.chat_page'] = run_load(users, n_requests, chat_page)
+        results['load.api_chat'] = run_load(users, n_requests, api_chat)
+        app_module.chat_writer.flush()
+        server.shutdown()
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms=0.0):
+    """Regression messages for cases slower (p50/p95) or lower-throughput than the baseline"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ('p50', 'p95'):
+            if (base[key] > 0 and current[key] > base[key] * (1 + threshold)
+                    and current[key] - base[key] >= min_delta_ms):
+                regressions.append(f"{name}: {key} {current[key]:.3f} ms > baseline {base[key]:.3f} ms "
+                                   f"(+{(current[key] / base[key] - 1) * 100:.0f}%)")
+        # The same noise floor, as time per call, for throughput
+        if (base['throughput'] > 0 and current['throughput'] < base['throughput'] * (1 - threshold)
+                and 1000 / current['throughput'] - 1000 / base['throughput'] >= min_delta_ms):
+            regressions.append(f"{name}: throughput {current['throughput']:.1f}/s < baseline "
+                               f"{base['throughput']:.1f}/s ({(current['throughput'] / base['throughput'] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def machine():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--groups', default='micro,load', help='comma-separated: micro, load')
+    parser.add_argument('--iterations', type=int, default=200, help='calls per micro-benchmark')
+    parser.add_argument('--users', type=int, default=8, help='concurrent load-test users')
+    parser.add_argument('--requests', type=int, default=25, help='requests per user for /chat and /api/chat')
+    parser.add_argument('--login-requests', type=int, default=2, help='logins per user (full-cost hashes)')
+    parser.add_argument('--latency', type=float, default=0.05, help='fake Cohere latency in seconds')
+    parser.add_argument('--model-ratio', type=float, default=0.2, help='share of /api/chat questions sent upstream')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown, e.g. 0.25 = 25%%')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help='ignore latency growth smaller than this many ms')
+    parser.add_argument('--output', help='also write this run\'s results to a JSON file')
+    args = parser.parse_args()
+    groups = {g.strip() for g in args.groups.split(',') if g.strip()}
+    settings = {k: getattr(args, k) for k in ('iterations', 'users', 'requests', 'login_requests',
+                                              'latency', 'model_ratio', 'seed')}
+
+    results = {}
+    if 'micro' in groups:
+        results.update(micro_benchmarks(args.iterations))
+    if 'load' in groups:
+        results.update(load_benchmarks(args.users, args.requests, args.login_requests,
+                                       args.latency, args.model_ratio, args.seed))
+
+    print(f"{'case':<32} {'n':>6} {'throughput':>12} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for name, r in results.items():
+        print(f"{name:<32} {r['n']:>6} {r['throughput']:10.1f}/s {r['p50']:7.3f} ms {r['p95']:7.3f} ms {r['p99']:7.3f} ms")
+
+    report = {'machine': machine(), 'settings': settings, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.save_baseline:
+        # Keep baseline cases from groups that were not run this time
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f).get('results', {})
+        report['results'] = dict(previous, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=1)
+            f.write('\n')
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != report['machine'] or baseline.get('settings') != settings:
+        print("warning: the baseline was recorded on another machine or with other settings")
+    regressions = compare(results, baseline.get('results', {}), args.threshold, args.min_delta_ms)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        return 1
+    print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,97 @@
-import requests
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Iterator, NamedTuple, Tuple, Optional
+import logging
 import re
 import os
-import pandas as pd
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import numpy as np
-from scipy.stats import linregress
+from dataset_index import DatasetIndex
+from dataset_snapshot import load_snapshot, save_snapshot
+from query_router import QueryRouter, Route
+from response_cache import ResponseCache, SingleFlight, make_cache_key
+from feature_store import read_store
+from dataset_watcher import FileWatcher
+from shared_dataset import SharedDataset
+from forecast import ForecastEngine, INTENT_INDICATORS, forecast_years, format_forecast
+from metrics import REGISTRY, MetricFamily, Sample, from_stats, gauge
+
+logger = logging.getLogger(__name__)
+
+DATASET_SOURCES = ['NASA', 'NOAA', 'IPCC', 'UNEP']
+DEFAULT_SOURCES = ['IPCC', 'NASA', 'NOAA']
+
+# Columnar features table built by etl.py; features.csv is its export and the fallback
+FEATURES_STORE = 'features.columnar'
+FEATURES_CSV = 'features.csv'
+NUMERIC_COLUMNS = ['co2', 'temp_anomaly', 'gmsl_mm', 'forest_loss_ha',
+                   'forest_cover_pct', 'ocean_ph', 'ozone',
+                   'precip_anomaly', 'seaice_extent']
+# Name of the (rows, numeric columns) float matrix in a shared publication
+VALUES_COLUMN = '__values__'
+
+INTENT_SECONDS = REGISTRY.histogram(
+    'dataset_intent_seconds', 'Dataset handler time per router intent; outcome is answered or passed',
+    ('intent', 'outcome'))
+DATASET_UNANSWERED = REGISTRY.counter(
+    'dataset_unanswered', 'Queries no dataset handler answered, left to the model')
+COHERE_SECONDS = REGISTRY.histogram(
+    'cohere_request_seconds', 'Cohere API call latency including retries; mode is generate or stream',
+    ('mode', 'outcome'))
+COHERE_ERRORS = REGISTRY.counter('cohere_errors', 'Failed Cohere API calls by kind', ('mode', 'kind'))
+COHERE_TIMEOUTS = REGISTRY.counter('cohere_timeouts', 'Cohere API calls that timed out', ('mode',))
+DATASET_LOAD_SECONDS = REGISTRY.histogram(
+    'dataset_load_seconds', 'Time to load a dataset version and build its index',
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+
+class RangeColumn(NamedTuple):
+    column: str
+    label: str
+    unit: str
+    digits: int
+
+
+# Column answered for each indicator intent over a year range ('forest_loss': forest + loss words)
+RANGE_COLUMNS = {
+    'co2': RangeColumn('co2', 'CO₂', ' ppm', 2),
+    'temperature': RangeColumn('temp_anomaly', 'temperature anomaly', '°C', 2),
+    'sea_level': RangeColumn('gmsl_mm', 'sea level', ' mm', 1),
+    'forest': RangeColumn('forest_cover_pct', 'forest cover', '% of land', 1),
+    'forest_loss': RangeColumn('forest_loss_ha', 'forest loss', ' ha', 0),
+    'ocean': RangeColumn('ocean_ph', 'ocean pH', '', 3),
+    'ozone': RangeColumn('ozone', 'ozone', ' DU', 1),
+    'precipitation': RangeColumn('precip_anomaly', 'precipitation anomaly', ' mm', 1),
+    'sea_ice': RangeColumn('seaice_extent', 'sea ice extent', ' million km²', 2),
+}
+
+
+class LoadedDataset(NamedTuple):
+    """One immutable version of the dataset and everything derived from it"""
+    version: int
+    source: Optional[str]
+    columns: Dict[str, np.ndarray]
+    index: DatasetIndex
+    loaded_at: float
+    load_seconds: float
+
+
+def _pack_columns(columns: Dict[str, np.ndarray]) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+    """Split columns into the numeric names, their (rows, n) float matrix and the other columns"""
+    numeric = [c for c in NUMERIC_COLUMNS if c in columns]
+    rows = len(columns['year']) if 'year' in columns else 0
+    if numeric:
+        values = np.column_stack([np.asarray(columns[c], dtype=np.float64) for c in numeric])
+    else:
+        values = np.empty((rows, 0))
+    return numeric, values, {name: array for name, array in columns.items() if name not in numeric}
+
 
 class EnvironmentalExpert:
     def __init__(self):
         # Initialize Cohere API with hardcoded API key
-        self.api_url = "https://api.cohere.ai/v1/generate"
+        self.api_url = os.getenv('COHERE_API_URL', "https://api.cohere.ai/v1/generate")
         self.api_key = "aJcTM8kNrQ31ssI5nQlsWjNIJX0RKVLybvMm4SWg"
         # Debug print to confirm API key in class
         print("API Key in EnvironmentalExpert:", self.api_key if self.api_key else "Not Set")
@@ -18,202 +99,476 @@ class EnvironmentalExpert:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         } if self.api_key else {}
+        # Pooled keep-alive client with retries and a circuit breaker, created on the first model call
+        self._llm_client = None
+        self._llm_lock = threading.Lock()
+        # Sources are tracked per thread so concurrent requests don't mix them up
+        self._local = threading.local()
         self.last_sources = []
-        # Load and preprocess environmental dataset
-        self.dataset = self._load_and_preprocess_data()
+        # Two-tier cache for model responses, shared across workers through SQLite
+        self.response_cache = ResponseCache(os.getenv('RESPONSE_CACHE_DB', os.path.join('instance', 'response_cache.db')))
+        # Identical questions asked concurrently share one upstream call
+        self.inflight = SingleFlight()
+        # Preprocessed dataset columns are cached in a binary snapshot ('' disables it)
+        self.snapshot_path = os.getenv('DATASET_SNAPSHOT', os.path.join('instance', 'dataset_snapshot.npz'))
+        # With several worker processes, one publishes the dataset into this directory
+        # (e.g. /dev/shm/envbot) and all of them map it read-only ('' keeps a private copy)
+        shared_dir = os.getenv('DATASET_SHARED_DIR', '')
+        self.shared = SharedDataset(shared_dir) if shared_dir else None
+        # Load and preprocess environmental dataset; reloads swap in a new version atomically
+        self._data: Optional[LoadedDataset] = None
+        self._reload_lock = threading.Lock()
+        self._dataset_cache = None
+        self.reloads = 0
+        self.reload_error: Optional[str] = None
+        self.reload_dataset()
+        # Watch the data source and hot-reload it when the ETL rewrites it (0 disables)
+        interval = float(os.getenv('DATASET_RELOAD_INTERVAL', '2'))
+        self.watcher = None
+        if interval > 0:
+            self.watcher = FileWatcher([FEATURES_STORE, FEATURES_CSV], self.reload_dataset, interval).start()
+        # Bundled forecast models, unpickled in the background on the first forecast
+        self.forecaster = ForecastEngine(os.getenv('FORECAST_MODELS_DIR', 'models'))
         # System prompt for the model - adjusted for brevity
         self.system_prompt = """You are an environmental data assistant created by me. Provide very short, factual answers (1-2 lines max) based on environmental insights, without examples or solutions unless asked."""
 
-        # Query handlers for dataset responses
+        # Query handlers for dataset responses, keyed by router intent
+        self.router = QueryRouter()
         self.dataset_queries = {
-            r'co2|carbon dioxide': self._handle_co2_query,
-            r'temperature|temp_anomaly|warming': self._handle_temp_query,
-            r'sea level|gmsl|sea-level': self._handle_sea_level_query,
-            r'forest|deforestation|vegetation': self._handle_forest_query,
-            r'ocean|ph|acidification': self._handle_ocean_query,
-            r'ozone': self._handle_ozone_query,
-            r'precipitation|rainfall|rain': self._handle_precip_query,
-            r'sea ice|arctic ice|ice extent': self._handle_seaice_query,
-            r'trend|change over time|historical': self._handle_trend_query,
-            r'current|latest|recent': self._handle_current_query,
-            r'compare|comparison|difference': self._handle_comparison_query
+            'forecast': self._handle_forecast_query,
+            'range': self._handle_range_query,
+            'co2': self._handle_co2_query,
+            'temperature': self._handle_temp_query,
+            'sea_level': self._handle_sea_level_query,
+            'forest': self._handle_forest_query,
+            'ocean': self._handle_ocean_query,
+            'ozone': self._handle_ozone_query,
+            'precipitation': self._handle_precip_query,
+            'sea_ice': self._handle_seaice_query,
+            'trend': self._handle_trend_query,
+            'current': self._handle_current_query,
+            'comparison': self._handle_comparison_query
         }
 
-    def _load_and_preprocess_data(self) -> pd.DataFrame:
-        """Load and preprocess the environmental dataset"""
+    def reload_dataset(self) -> LoadedDataset:
+        """(Re)load the dataset and rebuild the derived index and trends, then swap them in.
+
+        The new version is built off to the side; requests keep answering from the old one
+        until a single reference assignment publishes it. A failed reload keeps the old one.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            source = FEATURES_STORE if os.path.exists(FEATURES_STORE) else FEATURES_CSV
+            version = None
+            try:
+                if self.shared is not None:
+                    # Only the first worker to see a changed source loads it; the rest just map it
+                    version, store = self.shared.publish_source(source, lambda: self._publication(source))
+                    numeric, values, others = self._unpack_publication(store)
+                else:
+                    numeric, values, others = _pack_columns(self._load_and_preprocess_data(source))
+            except Exception as e:
+                print(f"Error loading dataset: {e}")
+                self.reload_error = str(e)
+                if self._data is not None:
+                    return self._data
+                source, version = None, 0
+                numeric, values, others = _pack_columns({})
+            data = self._swap(version, source, numeric, values, others, start)
+            if source is not None:
+                self.reload_error = None
+            return data
+
+    def _swap(self, version: Optional[int], source: Optional[str], numeric: List[str],
+              values: np.ndarray, others: Dict[str, np.ndarray], start: float) -> LoadedDataset:
+        """Build the index over the numeric matrix and publish the new version to readers"""
+        values.setflags(write=False)
+        columns = dict(others)
+        # Numeric columns are views into the matrix, so each value is held once
+        columns.update((name, values[:, i]) for i, name in enumerate(numeric))
+        for array in columns.values():
+            array.setflags(write=False)
+        years = columns.get('year', np.empty(0, dtype=np.int64))
+        previous = self._data
+        if version is None:
+            version = previous.version + 1 if previous else 1
+        data = LoadedDataset(
+            version=version,
+            source=source,
+            columns=columns,
+            index=DatasetIndex.from_arrays(numeric, values, years, columns.get('month')),
+            loaded_at=time.time(),
+            load_seconds=time.perf_counter() - start,
+        )
+        self._data = data
+        DATASET_LOAD_SECONDS.observe(data.load_seconds)
+        if previous is not None:
+            self.reloads += 1
+        return data
+
+    def _publication(self, source: str) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Columns and metadata to publish for the other workers"""
+        numeric, values, others = _pack_columns(self._load_and_preprocess_data(source))
+        return dict(others, **{VALUES_COLUMN: values}), {'name': source, 'numeric': numeric}
+
+    @staticmethod
+    def _unpack_publication(store) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        others = dict(store.columns)
+        values = others.pop(VALUES_COLUMN)
+        return list(store.meta['numeric']), values, others
+
+    def _sync_shared(self):
+        """Remap if another worker has published a newer version since we last looked"""
+        if self.shared is None or self.shared.version == self._data.version:
+            return
+        # Never stall an answer behind a reload already running in this process
+        if not self._reload_lock.acquire(blocking=False):
+            return
         try:
-            df = pd.read_csv('features.csv')
-            # Convert year to integer and ensure numeric columns
-            df['year'] = df['year'].astype(int)
-            numeric_cols = ['co2', 'temp_anomaly', 'gmsl_mm', 'forest_loss_ha',
-                            'forest_cover_pct', 'ocean_ph', 'ozone',
-                            'precip_anomaly', 'seaice_extent']
-            for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            # Add decade column for aggregation
-            df['decade'] = (df['year'] // 10) * 10
-            return df
+            start = time.perf_counter()
+            attached = self.shared.attach()
+            if attached is not None and attached[0] != self._data.version:
+                version, store = attached
+                numeric, values, others = self._unpack_publication(store)
+                self._swap(version, store.meta.get('name'), numeric, values, others, start)
+                self.reload_error = None
         except Exception as e:
-            print(f"Error loading dataset: {e}")
-            return pd.DataFrame()
+            print(f"Error mapping shared dataset: {e}")
+            self.reload_error = str(e)
+        finally:
+            self._reload_lock.release()
+
+    @property
+    def data(self) -> LoadedDataset:
+        """The dataset version this thread is answering from"""
+        return getattr(self._local, 'data', None) or self._data
+
+    @property
+    def index(self) -> DatasetIndex:
+        return self.data.index
+
+    @property
+    def dataset(self):
+        """The dataset as a DataFrame, built on first access (answers only need the index)"""
+        data = self.data
+        cached = self._dataset_cache
+        if cached is None or cached[0] != data.version:
+            import pandas as pd
+            df = pd.DataFrame(data.columns)
+            if 'year' in df:
+                # Add decade column for aggregation
+                df['decade'] = (df['year'] // 10) * 10
+            cached = self._dataset_cache = (data.version, df)
+        return cached[1]
+
+    def dataset_status(self) -> Dict:
+        """Version currently served and how long it took to load"""
+        data = self._data
+        return {
+            'version': data.version,
+            'source': data.source,
+            'rows': data.index.n_rows,
+            'loaded_at': datetime.utcfromtimestamp(data.loaded_at).isoformat(timespec='seconds') + 'Z',
+            'load_seconds': round(data.load_seconds, 6),
+            'reloads': self.reloads,
+            'last_error': self.reload_error,
+            'shared_dir': self.shared.directory if self.shared is not None else None,
+        }
+
+    def _load_and_preprocess_data(self, source: str) -> Dict[str, np.ndarray]:
+        """Load the environmental dataset columns, from the snapshot when it is current"""
+        columns = load_snapshot(self.snapshot_path, source) if self.snapshot_path else None
+        if columns is not None:
+            return columns
+        columns = self._read_source(source)
+        if self.snapshot_path:
+            try:
+                save_snapshot(self.snapshot_path, source, columns)
+            except OSError as e:
+                print(f"Dataset snapshot not saved: {e}")
+        return columns
+
+    @staticmethod
+    def _read_source(source: str) -> Dict[str, np.ndarray]:
+        if source == FEATURES_STORE:
+            # Already typed by the ETL; no parsing or coercion needed
+            return {name: np.array(values) for name, values in read_store(source).columns.items()}
+        import pandas as pd
+        df = pd.read_csv(source)
+        # Convert year to integer and ensure numeric columns
+        df['year'] = df['year'].astype(int)
+        for col in NUMERIC_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        return {col: df[col].to_numpy() for col in df.columns if df[col].dtype.kind in 'biuf'}
+
+    @property
+    def llm_client(self):
+        if self._llm_client is None:
+            with self._llm_lock:
+                if self._llm_client is None:
+                    # Deferred so dataset-only workers never import requests
+                    from llm_client import CohereClient
+                    self._llm_client = CohereClient(self.api_url, self.headers)
+        return self._llm_client
+
+    @property
+    def last_sources(self) -> List[str]:
+        sources = getattr(self._local, 'sources', None)
+        if sources is None:
+            sources = self._local.sources = []
+        return sources
+
+    @last_sources.setter
+    def last_sources(self, sources: List[str]):
+        self._local.sources = sources
 
     def get_response(self, user_query: str) -> str:
         """Get response to user query, trying dataset first then Cohere model"""
         try:
             self.last_sources = []
             query = user_query.lower().strip()
-            # Check for clear requests for examples/explanations
-            wants_examples = any(word in query for word in ['example', 'explain', 'detail', 'elaborate'])
-            wants_data = any(word in query for word in ['number', 'data', 'statistic', 'value', 'how much'])
+            # Route once: intents, years and examples/data flags
+            route = self.router.route(query)
             # First try to answer from dataset if appropriate
-            if not wants_examples or wants_data:
-                dataset_response = self._try_dataset_response(query)
-                if dataset_response:
-                    return dataset_response
+            dataset_response = self._answer_from_dataset(query, route)
+            if dataset_response:
+                return dataset_response
             # Otherwise use the Cohere model
-            return self._get_model_response(user_query, wants_examples)
+            return self._get_model_response(user_query, route.wants_examples)
         except Exception as e:
             return f"System error: {str(e)}. Please try again."
 
+    def get_dataset_response(self, user_query: str) -> Optional[str]:
+        """Answer from the dataset only; None means the question needs the model"""
+        try:
+            self.last_sources = []
+            query = user_query.lower().strip()
+            return self._answer_from_dataset(query, self.router.route(query))
+        except Exception as e:
+            print(f"Dataset answer failed: {e}")
+            return None
+
+    def get_responses(self, user_queries: List[str], max_concurrency: int = 8) -> List[Dict]:
+        """Answer a batch of questions, returning {'response', 'sources'} dicts in input order.
+
+        Every query is routed up front; dataset-backed ones are answered inline from the
+        index and the rest are sent to Cohere concurrently, at most max_concurrency at a time.
+        """
+        results: List[Optional[Dict]] = [None] * len(user_queries)
+        model_queries = []
+        for i, user_query in enumerate(user_queries):
+            try:
+                self.last_sources = []
+                query = user_query.lower().strip()
+                route = self.router.route(query)
+                response = self._answer_from_dataset(query, route)
+            except Exception as e:
+                results[i] = {'response': f"System error: {str(e)}. Please try again.",
+                              'sources': list(DEFAULT_SOURCES)}
+                continue
+            if response:
+                results[i] = {'response': response, 'sources': list(DATASET_SOURCES)}
+            else:
+                model_queries.append((i, user_query, route.wants_examples))
+        if model_queries:
+            workers = max(1, min(max_concurrency, len(model_queries)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chat-batch') as pool:
+                futures = [(i, pool.submit(self._get_model_response, user_query, wants_examples))
+                           for i, user_query, wants_examples in model_queries]
+                for i, future in futures:
+                    results[i] = {'response': future.result(), 'sources': list(DEFAULT_SOURCES)}
+        return results
+
     def get_last_sources(self) -> List[str]:
         """Get sources used for last response"""
-        return list(set(self.last_sources)) if self.last_sources else ['IPCC', 'NASA', 'NOAA']
+        return list(set(self.last_sources)) if self.last_sources else list(DEFAULT_SOURCES)
+
+    def _answer_from_dataset(self, query: str, route: Route) -> Optional[str]:
+        """Dataset answer unless the user explicitly asked for examples/explanations,
+        or asked a future-tense question the dataset can't answer"""
+        if route.wants_examples and not route.wants_data:
+            return None
+        if route.speculative:
+            return None
+        return self._try_dataset_response(query, route)
 
-    def _try_dataset_response(self, query: str) -> Optional[str]:
+    def _try_dataset_response(self, query: str, route: Optional[Route] = None) -> Optional[str]:
         """Try to answer the query from the dataset"""
-        # Check for year specification
-        year = self._extract_year(query)
-        decade = (year // 10) * 10 if year else None
-        # Check for dataset patterns
-        for pattern, handler in self.dataset_queries.items():
-            if re.search(pattern, query, re.IGNORECASE):
-                response = handler(query, year, decade)
+        if route is None:
+            route = self.router.route(query)
+        self._sync_shared()
+        # Pin one dataset version so a concurrent reload can't change it mid-answer
+        self._local.data = self._data
+        try:
+            # Intents come back in handler priority order; every handler answers from the pinned version
+            data = self._local.data
+            for intent in route.intents:
+                handler = self.dataset_queries[intent]
+                start = time.perf_counter()
+                response = handler(query, route, data)
+                INTENT_SECONDS.observe(time.perf_counter() - start, (intent, 'answered' if response else 'passed'))
                 if response:
-                    self.last_sources.extend(['NASA', 'NOAA', 'IPCC', 'UNEP'])
+                    self.last_sources.extend(DATASET_SOURCES)
                     return response
-        return None
+            DATASET_UNANSWERED.inc()
+            return None
+        finally:
+            self._local.data = None
 
-    def _extract_year(self, query: str) -> Optional[int]:
-        """Extract year from query if mentioned"""
-        year_match = re.search(r'(?:year|in|during|since)\s*(\d{4})', query)
-        if year_match:
-            try:
-                return int(year_match.group(1))
-            except:
-                return None
-        return None
+    def get_forecasts(self, names: List[str], years: List[int]) -> Dict:
+        """Forecasts for several indicators over the same years, for the dashboard"""
+        self._sync_shared()
+        data = self._data
+        forecasts = {}
+        for name in names:
+            forecast = self.forecaster.forecast(name, years, data.version, data.index)
+            forecasts[name] = {
+                'label': forecast.indicator.label,
+                'unit': forecast.indicator.unit,
+                'method': forecast.method,
+                'years': forecast.years.tolist(),
+                'values': [round(v, 4) for v in forecast.values.tolist()],
+            }
+        return {'dataset_version': data.version, 'forecasts': forecasts}
 
-    def _handle_co2_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_forecast_query(self, query: str, route: Route, data: LoadedDataset) -> Optional[str]:
+        """Handle forecast queries for future years from the bundled models"""
+        names = [INTENT_INDICATORS[i] for i in route.intents if i in INTENT_INDICATORS]
+        target_years = forecast_years(route.years, data.index.last_year)
+        if not names or not target_years:
+            return None
+        return ' '.join(format_forecast(self.forecaster.forecast(name, target_years, data.version, data.index))
+                        for name in names)
+
+    def _handle_range_query(self, query: str, route: Route, data: LoadedDataset) -> Optional[str]:
+        """Handle mean/sum/min/max/change questions over a year range, from the index's prefix tables"""
+        intents = [i for i in route.intents if i in RANGE_COLUMNS]
+        if route.span is None or not intents:
+            return None
+        start, end = route.span
+        aggregate = route.aggregate or 'mean'
+        answers = []
+        for intent in intents:
+            if intent == 'forest' and re.search(r'loss|deforest', query):
+                intent = 'forest_loss'
+            spec = RANGE_COLUMNS[intent]
+            stats = data.index.range_stats(spec.column, start, end)
+            if stats is None:
+                continue
+            answers.append(self._format_range(spec, stats, aggregate))
+        return ' '.join(answers) if answers else None
+
+    @staticmethod
+    def _format_range(spec: RangeColumn, stats, aggregate: str) -> str:
+        def fmt(value: float, sign: str = '') -> str:
+            return f"{value:{sign},.{spec.digits}f}{spec.unit}"
+
+        period = f"{stats.start}-{stats.end}" if stats.end > stats.start else str(stats.start)
+        count = f"{stats.years} year{'s' if stats.years != 1 else ''}"
+        if aggregate == 'sum':
+            return f"Total {spec.label} {period}: {fmt(stats.sum)} over {count}."
+        if aggregate == 'min':
+            return f"Lowest {spec.label} {period}: {fmt(stats.min)} in {stats.min_year}."
+        if aggregate == 'max':
+            return f"Highest {spec.label} {period}: {fmt(stats.max)} in {stats.max_year}."
+        if aggregate == 'change':
+            rate = stats.change / (stats.end - stats.start) if stats.end > stats.start else 0.0
+            return (f"{spec.label[0].upper()}{spec.label[1:]} went from {fmt(stats.first)} in {stats.start} "
+                    f"to {fmt(stats.last)} in {stats.end} ({fmt(stats.change, '+')}, {fmt(rate, '+')}/year).")
+        return f"Average {spec.label} {period}: {fmt(stats.mean)} ({count})."
+
+    def _handle_co2_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle CO2 related queries"""
-        if year and year in self.dataset['year'].values:
-            co2_data = self.dataset[self.dataset['year'] == year]['co2']
-            if not co2_data.empty:
-                co2_level = co2_data.mean()
-                return f"In {year}, average atmospheric CO₂ concentration was {co2_level:.2f} ppm."
-        if decade:
-            decade_data = self.dataset[self.dataset['decade'] == decade]
-            if not decade_data.empty:
-                avg_co2 = decade_data['co2'].mean()
-                return f"During {decade}s, average CO₂ was {avg_co2:.2f} ppm."
-        latest_co2 = self.dataset['co2'].iloc[-1]
-        avg_co2 = self.dataset['co2'].mean()
-        trend = self._calculate_trend('co2')
+        co2_level = data.index.year_value(route.year, 'co2')
+        if co2_level is not None:
+            return f"In {route.year}, average atmospheric CO₂ concentration was {co2_level:.2f} ppm."
+        avg_co2 = data.index.decade_value(route.decade, 'co2')
+        if avg_co2 is not None:
+            return f"During {route.decade}s, average CO₂ was {avg_co2:.2f} ppm."
+        latest_co2 = data.index.latest('co2')
+        avg_co2 = data.index.mean('co2')
+        trend = data.index.trend('co2')
         return (f"Current atmospheric CO₂: {latest_co2:.2f} ppm (historical avg: {avg_co2:.2f} ppm). "
                 f"Trend: Increasing by {trend:.2f} ppm/year.")
 
-    def _handle_temp_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_temp_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle temperature related queries"""
-        if year and year in self.dataset['year'].values:
-            temp_data = self.dataset[self.dataset['year'] == year]['temp_anomaly']
-            if not temp_data.empty:
-                temp = temp_data.mean()
-                return f"In {year}, global temperature anomaly was {temp:.2f}°C above baseline."
-        if decade:
-            decade_data = self.dataset[self.dataset['decade'] == decade]
-            if not decade_data.empty:
-                avg_temp = decade_data['temp_anomaly'].mean()
-                return f"During {decade}s, average temperature anomaly was {avg_temp:.2f}°C."
-        latest_temp = self.dataset['temp_anomaly'].iloc[-1]
-        trend = self._calculate_trend('temp_anomaly')
+        temp = data.index.year_value(route.year, 'temp_anomaly')
+        if temp is not None:
+            return f"In {route.year}, global temperature anomaly was {temp:.2f}°C above baseline."
+        avg_temp = data.index.decade_value(route.decade, 'temp_anomaly')
+        if avg_temp is not None:
+            return f"During {route.decade}s, average temperature anomaly was {avg_temp:.2f}°C."
+        latest_temp = data.index.latest('temp_anomaly')
+        trend = data.index.trend('temp_anomaly')
         return (f"Current global temperature anomaly: {latest_temp:.2f}°C. "
                 f"Trend: Warming at {trend:.2f}°C/year.")
 
-    def _handle_sea_level_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_sea_level_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle sea level related queries"""
-        if year and year in self.dataset['year'].values:
-            level_data = self.dataset[self.dataset['year'] == year]['gmsl_mm']
-            if not level_data.empty:
-                level = level_data.mean()
-                return f"In {year}, global mean sea level was {level:.1f} mm above baseline."
-        latest_level = self.dataset['gmsl_mm'].iloc[-1]
-        trend = self._calculate_trend('gmsl_mm')
+        level = data.index.year_value(route.year, 'gmsl_mm')
+        if level is not None:
+            return f"In {route.year}, global mean sea level was {level:.1f} mm above baseline."
+        latest_level = data.index.latest('gmsl_mm')
+        trend = data.index.trend('gmsl_mm')
         return (f"Current global mean sea level: {latest_level:.1f} mm above baseline. "
                 f"Trend: Rising at {trend:.1f} mm/year.")
 
-    def _handle_forest_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_forest_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle forest/vegetation related queries"""
-        if year and year in self.dataset['year'].values:
-            year_data = self.dataset[self.dataset['year'] == year]
-            if not year_data.empty:
-                loss = year_data['forest_loss_ha'].mean()
-                cover = year_data['forest_cover_pct'].mean()
-                return (f"In {year}: Forest loss {loss:,.0f} ha, "
-                        f"cover {cover:.1f}% of land area.")
-        avg_loss = self.dataset['forest_loss_ha'].mean()
-        avg_cover = self.dataset['forest_cover_pct'].mean()
-        trend = self._calculate_trend('forest_cover_pct')
+        year_data = data.index.year_values(route.year)
+        if year_data is not None and not np.isnan(year_data['forest_loss_ha']):
+            loss = year_data['forest_loss_ha']
+            cover = year_data['forest_cover_pct']
+            return (f"In {route.year}: Forest loss {loss:,.0f} ha, "
+                    f"cover {cover:.1f}% of land area.")
+        avg_loss = data.index.mean('forest_loss_ha')
+        avg_cover = data.index.mean('forest_cover_pct')
+        trend = data.index.trend('forest_cover_pct')
         return (f"Average annual forest loss: {avg_loss:,.0f} ha. "
                 f"Average cover: {avg_cover:.1f}% (trend: {trend:.2f}%/year change).")
 
-    def _handle_ocean_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_ocean_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle ocean acidification/ph queries"""
-        if year and year in self.dataset['year'].values:
-            ph_data = self.dataset[self.dataset['year'] == year]['ocean_ph']
-            if not ph_data.empty:
-                ph = ph_data.mean()
-                return f"In {year}, average ocean pH was {ph:.3f}."
-        latest_ph = self.dataset['ocean_ph'].iloc[-1]
-        trend = self._calculate_trend('ocean_ph')
+        ph = data.index.year_value(route.year, 'ocean_ph')
+        if ph is not None:
+            return f"In {route.year}, average ocean pH was {ph:.3f}."
+        latest_ph = data.index.latest('ocean_ph')
+        trend = data.index.trend('ocean_ph')
         return (f"Current ocean pH: {latest_ph:.3f}. "
                 f"Trend: Acidifying at {abs(trend):.3f} pH units/year.")
 
-    def _handle_ozone_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_ozone_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle ozone layer queries"""
-        if year and year in self.dataset['year'].values:
-            ozone_data = self.dataset[self.dataset['year'] == year]['ozone']
-            if not ozone_data.empty:
-                ozone = ozone_data.mean()
-                return f"In {year}, average ozone concentration was {ozone:.1f} Dobson Units."
-        latest_ozone = self.dataset['ozone'].iloc[-1]
-        trend = self._calculate_trend('ozone')
+        ozone = data.index.year_value(route.year, 'ozone')
+        if ozone is not None:
+            return f"In {route.year}, average ozone concentration was {ozone:.1f} Dobson Units."
+        latest_ozone = data.index.latest('ozone')
+        trend = data.index.trend('ozone')
         return (f"Current ozone concentration: {latest_ozone:.1f} Dobson Units. "
                 f"Trend: {'Increasing' if trend > 0 else 'Decreasing'} at {abs(trend):.2f} Units/year.")
 
-    def _handle_precip_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_precip_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle precipitation queries"""
-        if year and year in self.dataset['year'].values:
-            precip_data = self.dataset[self.dataset['year'] == year]['precip_anomaly']
-            if not precip_data.empty:
-                precip = precip_data.mean()
-                return f"In {year}, precipitation anomaly was {precip:.1f} mm from baseline."
-        latest_precip = self.dataset['precip_anomaly'].iloc[-1]
-        trend = self._calculate_trend('precip_anomaly')
+        precip = data.index.year_value(route.year, 'precip_anomaly')
+        if precip is not None:
+            return f"In {route.year}, precipitation anomaly was {precip:.1f} mm from baseline."
+        latest_precip = data.index.latest('precip_anomaly')
+        trend = data.index.trend('precip_anomaly')
         return (f"Current precipitation anomaly: {latest_precip:.1f} mm. "
                 f"Trend: {'Increasing' if trend > 0 else 'Decreasing'} at {abs(trend):.2f} mm/year.")
 
-    def _handle_seaice_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_seaice_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle sea ice extent queries"""
-        if year and year in self.dataset['year'].values:
-            ice_data = self.dataset[self.dataset['year'] == year]['seaice_extent']
-            if not ice_data.empty:
-                ice = ice_data.mean()
-                return f"In {year}, average sea ice extent was {ice:.2f} million km²."
-        latest_ice = self.dataset['seaice_extent'].iloc[-1]
-        trend = self._calculate_trend('seaice_extent')
+        ice = data.index.year_value(route.year, 'seaice_extent')
+        if ice is not None:
+            return f"In {route.year}, average sea ice extent was {ice:.2f} million km²."
+        latest_ice = data.index.latest('seaice_extent')
+        trend = data.index.trend('seaice_extent')
         return (f"Current sea ice extent: {latest_ice:.2f} million km². "
                 f"Trend: Declining at {abs(trend):.3f} million km²/year.")
 
-    def _handle_trend_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_trend_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle trend-related queries"""
         trends = []
         columns = {
@@ -224,92 +579,238 @@ class EnvironmentalExpert:
             'ocean_ph': 'Ocean pH (units/year)',
             'seaice_extent': 'Sea Ice (million km²/year)'
         }
+        start_year = route.year if re.search(r'since\s*\d{4}', query) else None
+        if start_year and (not len(data.index.years) or start_year > data.index.years[-1]):
+            start_year = None
         for col, label in columns.items():
-            trend = self._calculate_trend(col)
+            trend = data.index.trend(col, start_year)
             trends.append(f"{label}: {trend:+.3f}")
-        return "Current environmental trends:\n" + "\n".join(f"• {t}" for t in trends)
+        heading = f"Environmental trends since {start_year}" if start_year else "Current environmental trends"
+        return f"{heading}:\n" + "\n".join(f"• {t}" for t in trends)
 
-    def _handle_current_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_current_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle requests for current/latest data"""
-        latest = self.dataset.iloc[-1]
+        index = data.index
+
+        def latest(column, fmt, unit=''):
+            # Sources end in different years; say so where one lags the dataset
+            year = index.latest_year(column)
+            suffix = f" ({year})" if year != index.last_year else ''
+            return f"{index.latest(column):{fmt}}{unit}{suffix}"
+
         return (
-            f"Latest environmental data (year {latest['year']}):\n"
-            f"• CO₂: {latest['co2']:.2f} ppm\n"
-            f"• Temp anomaly: {latest['temp_anomaly']:.2f}°C\n"
-            f"• Sea level: {latest['gmsl_mm']:.1f} mm\n"
-            f"• Forest cover: {latest['forest_cover_pct']:.1f}%\n"
-            f"• Ocean pH: {latest['ocean_ph']:.3f}"
+            f"Latest environmental data (year {index.last_year}):\n"
+            f"• CO₂: {latest('co2', '.2f', ' ppm')}\n"
+            f"• Temp anomaly: {latest('temp_anomaly', '.2f', '°C')}\n"
+            f"• Sea level: {latest('gmsl_mm', '.1f', ' mm')}\n"
+            f"• Forest cover: {latest('forest_cover_pct', '.1f', '%')}\n"
+            f"• Ocean pH: {latest('ocean_ph', '.3f')}"
         )
 
-    def _handle_comparison_query(self, query: str, year: Optional[int], decade: Optional[int]) -> str:
+    def _handle_comparison_query(self, query: str, route: Route, data: LoadedDataset) -> str:
         """Handle comparison queries between years/periods"""
-        year_matches = re.findall(r'\d{4}', query)
-        if len(year_matches) >= 2:
-            try:
-                year1, year2 = map(int, year_matches[:2])
-                data1 = self.dataset[self.dataset['year'] == year1].iloc[0]
-                data2 = self.dataset[self.dataset['year'] == year2].iloc[0]
+        if len(route.years) >= 2:
+            year1, year2 = route.years[:2]
+            data1 = data.index.year_values(year1)
+            data2 = data.index.year_values(year2)
+            if data1 is not None and data2 is not None:
                 comparisons = []
                 for col in ['co2', 'temp_anomaly', 'gmsl_mm', 'forest_cover_pct']:
                     val1 = data1[col]
                     val2 = data2[col]
+                    if np.isnan(val1) or np.isnan(val2):
+                        continue
                     change = ((val2 - val1)/val1 * 100) if val1 != 0 else 0
                     comparisons.append(
                         f"{col.replace('_', ' ').title()}: {val1:.2f} → {val2:.2f} ({change:+.1f}%)"
                     )
-                return f"Comparison {year1} vs {year2}:\n" + "\n".join(f"• {c}" for c in comparisons)
-            except:
-                pass
-        # Default comparison: first vs last year in dataset
-        first = self.dataset.iloc[0]
-        latest = self.dataset.iloc[-1]
-        years = latest['year'] - first['year']
+                if comparisons:
+                    return f"Comparison {year1} vs {year2}:\n" + "\n".join(f"• {c}" for c in comparisons)
+        # Default comparison: each indicator's first vs last year in the dataset
+        first_year = data.index.first_year
+        last_year = data.index.last_year
         comparisons = []
         for col in ['co2', 'temp_anomaly', 'gmsl_mm']:
-            change = (latest[col] - first[col])/years
+            span = (data.index.latest_year(col) or 0) - (data.index.first_year_of(col) or 0)
+            if not span:
+                continue
+            change = (data.index.latest(col) - data.index.first(col))/span
             comparisons.append(
                 f"{col.replace('_', ' ').title()}: {change:+.2f}/year"
             )
-        return f"Long-term trends ({first['year']}-{latest['year']}):\n" + "\n".join(f"• {c}" for c in comparisons)
+        return f"Long-term trends ({first_year}-{last_year}):\n" + "\n".join(f"• {c}" for c in comparisons)
+
+    def _calculate_trend(self, column: str, start_year: Optional[int] = None) -> float:
+        """Linear trend for a dataset column, precomputed by the index at load time"""
+        return self.index.trend(column, start_year)
+
+    def stream_response(self, user_query: str) -> Iterator[Dict]:
+        """Yield {'token': ...} events as the answer is produced, then a final
+        {'done': True, 'response': ..., 'sources': [...]} event with the trimmed text"""
+        self.last_sources = []
+        try:
+            query = user_query.lower().strip()
+            route = self.router.route(query)
+            response = self._answer_from_dataset(query, route)
+            if response:
+                yield {'token': response}
+            else:
+                response = yield from self._stream_model_response(user_query, route.wants_examples)
+        except Exception as e:
+            response = f"System error: {str(e)}. Please try again."
+        yield {'done': True, 'response': response, 'sources': self.get_last_sources()}
 
-    def _calculate_trend(self, column: str) -> float:
-        """Calculate linear trend for a dataset column using linear regression"""
-        x = np.arange(len(self.dataset))
-        y = self.dataset[column].values
-        slope, _, _, _, _ = linregress(x, y)
-        return slope
+    def _build_payload(self, user_query: str, wants_examples: bool) -> Tuple[Dict, str]:
+        """Cohere generate payload for a question, plus its response cache key"""
+        prompt = self._enhance_query(user_query, wants_examples)
+        formatted_prompt = self._format_prompt(prompt)
+        payload = {
+            "model": "command",  # Cohere's default model for text generation
+            "prompt": formatted_prompt,
+            "max_tokens": 50,  # Reduced to ensure short responses (1-2 lines)
+            "temperature": 0.3,  # Lower temperature for factual, concise answers
+            "k": 0,
+            "p": 0.75,
+            "stop_sequences": ["\n\n"],  # Stop at double newline to keep responses short
+            "return_likelihoods": "NONE"
+        }
+        params = {k: v for k, v in payload.items() if k != 'prompt'}
+        cache_key = make_cache_key(prompt, dict(params, system=self.system_prompt))
+        return payload, cache_key
+
+    @staticmethod
+    def _record_cohere(mode: str, start: float, error=None):
+        """Observe a Cohere call's latency; error is an exception or an error kind"""
+        kind = None
+        if isinstance(error, str):
+            kind = error
+        elif error is not None:
+            import requests
+            from llm_client import CircuitOpenError
+            if isinstance(error, CircuitOpenError):
+                kind = 'circuit_open'
+            elif isinstance(error, requests.exceptions.Timeout):
+                kind = 'timeout'
+            elif isinstance(error, requests.exceptions.ConnectionError):
+                kind = 'connection'
+            elif isinstance(error, requests.exceptions.HTTPError):
+                kind = 'http'
+            else:
+                kind = 'error'
+        COHERE_SECONDS.observe(time.perf_counter() - start, (mode, kind or 'ok'))
+        if kind is not None:
+            COHERE_ERRORS.inc((mode, kind))
+        if kind == 'timeout':
+            COHERE_TIMEOUTS.inc((mode,))
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Scrape-time metrics from the caches, circuit breaker, dataset and forecaster"""
+        families = from_stats('response_cache', self.response_cache.stats(), 'Model response cache',
+                              counters=('memory_hits', 'shared_hits', 'misses'))
+        families += from_stats('cohere_singleflight', self.inflight.stats(), 'Coalesced Cohere calls',
+                               counters=('executed', 'coalesced'))
+        client = self._llm_client
+        if client is not None:
+            state = client.breaker.state
+            families.append(MetricFamily(
+                'cohere_circuit_state', 'gauge', 'Cohere circuit breaker state (1 for the current one)',
+                [Sample('', (('state', name),), float(name == state)) for name in ('closed', 'open', 'half-open')]))
+            families.append(gauge('cohere_circuit_failures', 'Consecutive Cohere failures', client.breaker.failures))
+        data = self._data
+        families += [
+            gauge('dataset_version', 'Dataset version currently served', data.version),
+            gauge('dataset_rows', 'Rows in the dataset currently served', data.index.n_rows),
+            gauge('dataset_loaded_timestamp_seconds', 'When the served dataset version was loaded', data.loaded_at),
+            gauge('dataset_last_load_seconds', 'Load time of the served dataset version', data.load_seconds),
+            MetricFamily('dataset_reloads', 'counter', 'Dataset versions swapped in after the first',
+                         [Sample('_total', (), float(self.reloads))]),
+        ]
+        status = self.forecaster.status()
+        families += [
+            gauge('forecast_models_loaded', 'Forecast models unpickled and in use', len(status['models'])),
+            gauge('forecast_memo_entries', 'Memoized forecast values', status['memoized']),
+        ]
+        return families
+
+    def _api_unavailable_message(self, error: Exception) -> str:
+        return f"Unable to access Cohere API. Error: {str(error)}. As a fallback, I can only answer questions directly related to the environmental dataset for now."
 
     def _get_model_response(self, user_query: str, wants_examples: bool = False) -> str:
         """Get response from Cohere model with appropriate context"""
         try:
             if not self.api_key:
                 return "Cohere API key is not set. Please ensure the key is correctly defined in the code."
-            prompt = self._enhance_query(user_query, wants_examples)
-            formatted_prompt = self._format_prompt(prompt)
-            payload = {
-                "model": "command",  # Cohere's default model for text generation
-                "prompt": formatted_prompt,
-                "max_tokens": 50,  # Reduced to ensure short responses (1-2 lines)
-                "temperature": 0.3,  # Lower temperature for factual, concise answers
-                "k": 0,
-                "p": 0.75,
-                "stop_sequences": ["\n\n"],  # Stop at double newline to keep responses short
-                "return_likelihoods": "NONE"
-            }
-            print("Sending request to Cohere API with payload:", payload)
-            print("Headers being sent:", {"Authorization": "REDACTED" if self.api_key else "Not Set", "Content-Type": "application/json"})
-            response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=15)
-            response.raise_for_status()
-            response_data = response.json()
-            print("Received response from Cohere API:", response_data)
+            payload, cache_key = self._build_payload(user_query, wants_examples)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            return self.inflight.do(cache_key, lambda: self._fetch_model_response(payload, cache_key, wants_examples))
+        except Exception as e:
+            return f"Analysis error: {str(e)}. Please try again."
+
+    def _fetch_model_response(self, payload: Dict, cache_key: str, wants_examples: bool) -> str:
+        """Call Cohere for a payload; run once per key by the single-flight group"""
+        import requests
+        try:
+            # A previous leader for this key may have filled the cache meanwhile
+            cached = self.response_cache.memory.get(cache_key)
+            if cached is not None:
+                return cached
+            # Payloads carry user questions: debug level only, never on by default
+            logger.debug("Cohere request payload: %s", payload)
+            start = time.perf_counter()
+            try:
+                response_data = self.llm_client.generate(payload)
+            except Exception as e:
+                self._record_cohere('generate', start, e)
+                raise
+            logger.debug("Cohere response: %s", response_data)
             if response_data and 'generations' in response_data and len(response_data['generations']) > 0 and 'text' in response_data['generations'][0]:
-                return self._process_response(response_data['generations'][0]['text'], wants_examples)
+                self._record_cohere('generate', start)
+                result = self._process_response(response_data['generations'][0]['text'], wants_examples)
+                self.response_cache.set(cache_key, result)
+                return result
             elif response_data and 'message' in response_data:
+                self._record_cohere('generate', start, 'api_error')
                 return f"API Error: {response_data['message']}. Please try again later."
             else:
+                self._record_cohere('generate', start, 'bad_response')
                 return "Received unexpected response format from Cohere API. Please try again later."
         except requests.exceptions.RequestException as e:
-            return f"Unable to access Cohere API. Error: {str(e)}. As a fallback, I can only answer questions directly related to the environmental dataset for now."
+            return self._api_unavailable_message(e)
+        except Exception as e:
+            return f"Analysis error: {str(e)}. Please try again."
+
+    def _stream_model_response(self, user_query: str, wants_examples: bool = False):
+        """Generator yielding token events from Cohere's streaming API; returns the trimmed text"""
+        import requests
+        try:
+            if not self.api_key:
+                return "Cohere API key is not set. Please ensure the key is correctly defined in the code."
+            payload, cache_key = self._build_payload(user_query, wants_examples)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield {'token': cached}
+                return cached
+            chunks = []
+            start = time.perf_counter()
+            try:
+                for event in self.llm_client.stream_generate(payload):
+                    if event.get('is_finished'):
+                        break
+                    text = event.get('text')
+                    if text:
+                        chunks.append(text)
+                        yield {'token': text}
+            except Exception as e:
+                self._record_cohere('stream', start, e)
+                raise
+            self._record_cohere('stream', start)
+            result = self._process_response(''.join(chunks), wants_examples)
+            self.response_cache.set(cache_key, result)
+            return result
+        except requests.exceptions.RequestException as e:
+            return self._api_unavailable_message(e)
         except Exception as e:
             return f"Analysis error: {str(e)}. Please try again."
 
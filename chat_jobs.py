@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import threading
+import time
+import uuid
+
+
+class ChatJob:
+    """State of one background chat answer"""
+
+    def __init__(self, owner: int):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict:
+        data = {'job_id': self.id, 'status': self.status}
+        if self.status == 'done':
+            data.update(self.result)
+        elif self.status == 'error':
+            data['error'] = self.error
+        return data
+
+
+class ChatJobQueue:
+    """Bounded worker pool running chat answers off the request thread"""
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, result_ttl: float = 300.0):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chat-job')
+        self._jobs: Dict[str, ChatJob] = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, owner: int, fn: Callable[[], Dict]) -> Optional[ChatJob]:
+        """Queue fn for an owner; returns None when the queue is full"""
+        with self._lock:
+            self._expire()
+            if self._active >= self.max_pending:
+                return None
+            job = ChatJob(owner)
+            self._jobs[job.id] = job
+            self._active += 1
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: ChatJob, fn: Callable[[], Dict]):
+        job.status = 'running'
+        try:
+            job.result = fn()
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'error'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active -= 1
+            job.done.set()
+
+    def get(self, job_id: str, owner: int) -> Optional[ChatJob]:
+        """Look up a job, only for the user that submitted it"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def wait(self, job_id: str, owner: int, timeout: float) -> Optional[ChatJob]:
+        """Long-poll: block up to timeout seconds for the job to finish"""
+        job = self.get(job_id, owner)
+        if job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
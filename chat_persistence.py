@@ -0,0 +1,193 @@
+from datetime import datetime
+from typing import Dict, List
+import atexit
+import queue
+import random
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from models import db, ChatMessage
+from metrics import REGISTRY
+
+# mode: batch (write-behind flush), sync (queue full or closed), direct and bulk (app.py)
+COMMIT_SECONDS = REGISTRY.histogram('chat_db_commit_seconds', 'ChatMessage insert and commit time', ('mode',))
+COMMIT_ROWS = REGISTRY.counter('chat_db_rows', 'ChatMessage rows committed', ('mode',))
+COMMIT_ERRORS = REGISTRY.counter('chat_db_commit_errors', 'Failed ChatMessage commits', ('mode',))
+
+
+class ChatWriteBehind:
+    """Buffers ChatMessage rows in memory and inserts them in batched transactions.
+
+    A background thread flushes when batch_size rows are queued or flush_interval
+    seconds have passed since the first queued row, and once more at interpreter exit.
+    A batch whose commit fails is rolled back and retried while the error looks
+    transient (e.g. a locked database), then inserted row by row, so one bad row
+    or a brief outage does not drop everything buffered with it.
+    """
+
+    def __init__(self, app, batch_size: int = 200, flush_interval: float = 0.5,
+                 max_queue: int = 10000, enqueue_timeout: float = 1.0,
+                 max_retries: int = 3, retry_backoff: float = 0.05):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.sync_writes = 0
+        self.retries = 0
+        self.row_fallbacks = 0
+        self.lost_rows = 0
+        self._thread = threading.Thread(target=self._run, name='chat-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, user_id: int, user_message: str, bot_response: str, sources: str):
+        """Queue a row; when the queue stays full, write it synchronously instead"""
+        row = {
+            'user_id': user_id,
+            'user_message': user_message,
+            'bot_response': bot_response,
+            'sources': sources,
+            # Stamp now, not at flush time, so history ordering reflects when it was said
+            'timestamp': datetime.utcnow()
+        }
+        if self._stop.is_set():
+            self._write([row], sync=True)
+            return
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._write([row], sync=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_queued(batch)
+        self._drain()
+
+    def _drain(self):
+        """Write everything currently queued from the calling thread"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write_queued(batch)
+                batch = []
+        if batch:
+            self._write_queued(batch)
+
+    def flush(self):
+        """Block until every row queued so far has been written"""
+        if self._thread.is_alive():
+            self._queue.join()
+        else:
+            self._drain()
+
+    def _write_queued(self, rows: List[Dict]):
+        try:
+            self._write(rows)
+        finally:
+            for _ in rows:
+                self._queue.task_done()
+
+    def _write(self, rows: List[Dict], sync: bool = False):
+        mode = 'sync' if sync else 'batch'
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                self._insert(rows)
+                break
+            except OperationalError as e:
+                # Locked or briefly unavailable database: the same batch may well succeed shortly
+                COMMIT_ERRORS.inc((mode,))
+                if attempt >= self.max_retries:
+                    print(f"Failed to persist {len(rows)} chat messages after {attempt + 1} attempts: {e}")
+                    self._write_rows(rows, mode)
+                    return
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                time.sleep(random.uniform(0, self.retry_backoff * (2 ** (attempt - 1))))
+            except Exception as e:
+                # Anything else (e.g. a constraint violation) will fail again as a batch
+                COMMIT_ERRORS.inc((mode,))
+                print(f"Failed to persist {len(rows)} chat messages: {e}")
+                self._write_rows(rows, mode)
+                return
+        COMMIT_SECONDS.observe(time.perf_counter() - start, (mode,))
+        COMMIT_ROWS.inc((mode,), len(rows))
+        with self._lock:
+            self.flushed_rows += len(rows)
+            self.flushed_batches += 1
+            if sync:
+                self.sync_writes += 1
+
+    def _insert(self, rows: List[Dict]):
+        with self.app.app_context():
+            try:
+                db.session.execute(db.insert(ChatMessage), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _write_rows(self, rows: List[Dict], mode: str):
+        """Insert a failed batch one row per transaction; only rows that fail alone are lost"""
+        written = lost = 0
+        for row in rows:
+            try:
+                self._insert([row])
+                written += 1
+            except Exception as e:
+                lost += 1
+                print(f"Dropped chat message for user {row.get('user_id')}: {e}")
+        COMMIT_ROWS.inc((mode,), written)
+        with self._lock:
+            self.row_fallbacks += 1
+            self.flushed_rows += written
+            self.lost_rows += lost
+            if mode == 'sync':
+                self.sync_writes += 1
+
+    def close(self):
+        """Stop the flusher thread and write whatever is still queued"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=10)
+        self._drain()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'flushed_rows': self.flushed_rows,
+                'flushed_batches': self.flushed_batches,
+                'sync_writes': self.sync_writes,
+                'retries': self.retries,
+                'row_fallbacks': self.row_fallbacks,
+                'lost_rows': self.lost_rows,
+            }
@@ -0,0 +1,319 @@
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+
+
+class RangeStats(NamedTuple):
+    """Aggregates of one column's yearly means over a year window"""
+    start: int          # first and last years in the window that have data
+    end: int
+    years: int          # number of years with data
+    mean: float
+    sum: float
+    min: float
+    min_year: int
+    max: float
+    max_year: int
+    first: float        # yearly means at start and end
+    last: float
+
+    @property
+    def change(self) -> float:
+        return self.last - self.first
+
+
+class DatasetIndex:
+    """Precomputed per-year and per-decade aggregates over the numeric dataset columns"""
+
+    def __init__(self, df, columns: Optional[List[str]] = None):
+        if columns is None:
+            import pandas as pd
+            columns = [c for c in df.columns
+                       if c not in ('year', 'decade') and pd.api.types.is_numeric_dtype(df[c])]
+        months = None
+        if len(df):
+            values = df[list(columns)].to_numpy(dtype=np.float64)
+            years = df['year'].to_numpy(dtype=np.int64)
+            if 'month' in df.columns:
+                months = df['month'].to_numpy(dtype=np.int64)
+        else:
+            values = np.empty((0, len(columns)), dtype=np.float64)
+            years = np.empty(0, dtype=np.int64)
+        self._build(list(columns), values, years, months)
+
+    @classmethod
+    def from_arrays(cls, columns: List[str], values: np.ndarray, years: np.ndarray,
+                    months: Optional[np.ndarray] = None) -> 'DatasetIndex':
+        """Build from a (rows, columns) float matrix and the row years (and months), without pandas"""
+        index = cls.__new__(cls)
+        index._build(list(columns), np.asarray(values, dtype=np.float64).reshape(len(years), len(columns)),
+                     np.asarray(years, dtype=np.int64),
+                     None if months is None else np.asarray(months, dtype=np.int64))
+        return index
+
+    def _build(self, columns: List[str], values: np.ndarray, years: np.ndarray,
+               months: Optional[np.ndarray] = None):
+        self.columns = columns
+        self._col: Dict[str, int] = {col: i for i, col in enumerate(self.columns)}
+        self.n_rows = len(years)
+        self.values = values
+        self.row_years = years
+
+        # Whole-dataset aggregates used by the "current" answers. Sources cover different
+        # periods, so each column's first and last values are its own first and last non-NaN ones.
+        self.first_row, self.column_first_years = self._edge_values(values, years, last=False)
+        self.last_row, self.column_last_years = self._edge_values(values, years, last=True)
+        self.first_year = int(years[0]) if self.n_rows else None
+        self.last_year = int(years[-1]) if self.n_rows else None
+        self.column_means = self._group_means(values, np.zeros(self.n_rows, dtype=np.int64), 1)[0]
+
+        # Per-year aggregates with a dense year -> row lookup table
+        self.years, year_groups = np.unique(years, return_inverse=True)
+        self.year_means = self._group_means(values, year_groups, len(self.years))
+        self._year_min, self._year_lookup = self._build_lookup(self.years, 1)
+        # Dense year -> first position at or after it, so window bounds cost no search
+        self._year_ceil = np.searchsorted(self.years, np.arange(len(self._year_lookup)) + self._year_min)
+
+        # Per-year regression moments and their prefix sums for the trend engine. x is the
+        # decimal year, so slopes are per year whether rows are monthly or annual.
+        x = years.astype(np.float64) if months is None else years + (months - 1) / 12.0
+        # Centred for numerical stability; slopes don't depend on the offset
+        self._x_centre = (float(x.min()) + float(x.max())) / 2.0 if self.n_rows else 0.0
+        # Where a yearly mean sits on the x axis relative to its year (5.5/12 for monthly rows)
+        self._year_offset = float((x - years).mean()) if self.n_rows else 0.0
+        self._trend_prefix = self._build_trend_prefix(values, x - self._x_centre, year_groups, len(self.years))
+        self.slopes = self._slopes_between(0, len(self.years))
+
+        # Prefix sums/counts and sparse min/max tables over the yearly means for range queries
+        self._build_range_tables(self.year_means)
+
+        # Per-decade aggregates
+        self.decades, decade_groups = np.unique((years // 10) * 10, return_inverse=True)
+        self.decade_means = self._group_means(values, decade_groups, len(self.decades))
+        self._decade_min, self._decade_lookup = self._build_lookup(self.decades, 10)
+
+    @staticmethod
+    def _edge_values(values: np.ndarray, years: np.ndarray, last: bool):
+        """Each column's first (or last) non-NaN value and its year; NaN and None where it has none"""
+        n_cols = values.shape[1]
+        edge = np.full(n_cols, np.nan)
+        edge_years: List[Optional[int]] = [None] * n_cols
+        if not len(years):
+            return edge, edge_years
+        valid = ~np.isnan(values)
+        rows = len(years) - 1 - valid[::-1].argmax(axis=0) if last else valid.argmax(axis=0)
+        for col, row in enumerate(rows):
+            if valid[row, col]:
+                edge[col] = values[row, col]
+                edge_years[col] = int(years[row])
+        return edge, edge_years
+
+    @staticmethod
+    def _group_means(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+        """NaN-aware mean of every column within each group"""
+        valid = ~np.isnan(values)
+        sums = np.zeros((n_groups, values.shape[1]))
+        counts = np.zeros((n_groups, values.shape[1]))
+        np.add.at(sums, groups, np.where(valid, values, 0.0))
+        np.add.at(counts, groups, valid)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+    @staticmethod
+    def _build_trend_prefix(values: np.ndarray, x: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+        """Prefix sums over the year axis of the least-squares moments n, Σx, Σy, Σxy, Σx²
+
+        x is the (centred) decimal year of every row.
+        """
+        n_cols = values.shape[1]
+        x = x[:, None]
+        valid = ~np.isnan(values)
+        y = np.where(valid, values, 0.0)
+        xv = np.where(valid, x, 0.0)
+        moments = np.stack([valid.astype(np.float64), xv, y, xv * y, xv * xv])
+        per_year = np.zeros((5, n_groups, n_cols))
+        for m in range(5):
+            np.add.at(per_year[m], groups, moments[m])
+        prefix = np.zeros((5, n_groups + 1, n_cols))
+        np.cumsum(per_year, axis=1, out=prefix[:, 1:])
+        return prefix
+
+    def _slopes_between(self, lo: int, hi: int) -> np.ndarray:
+        """Closed-form OLS slope of every column over the year positions [lo, hi)"""
+        n, sx, sy, sxy, sxx = self._trend_prefix[:, hi] - self._trend_prefix[:, lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slopes = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        slopes[n < 2] = np.nan
+        return slopes
+
+    def _build_range_tables(self, year_means: np.ndarray):
+        n, n_cols = year_means.shape
+        valid = ~np.isnan(year_means)
+        self._range_prefix = np.zeros((2, n + 1, n_cols))
+        np.cumsum(np.where(valid, year_means, 0.0), axis=0, out=self._range_prefix[0, 1:])
+        np.cumsum(valid, axis=0, out=self._range_prefix[1, 1:])
+        # Nearest position with data at or after / at or before every position
+        positions = np.arange(n)[:, None]
+        self._next_valid = np.minimum.accumulate(np.where(valid, positions, n)[::-1], axis=0)[::-1]
+        self._prev_valid = np.maximum.accumulate(np.where(valid, positions, -1), axis=0)
+        self._range_min = self._sparse_table(np.where(valid, year_means, np.inf), np.less)
+        self._range_max = self._sparse_table(np.where(valid, year_means, -np.inf), np.greater)
+
+    @staticmethod
+    def _sparse_table(values: np.ndarray, better):
+        """Level k holds, for every start position, the position of the best value among the next 2**k"""
+        n, n_cols = values.shape
+        levels = [np.repeat(np.arange(n)[:, None], n_cols, axis=1)]
+        width = 1
+        while 2 * width <= n:
+            prev = levels[-1]
+            left, right = prev[:n - 2 * width + 1], prev[width:n - width + 1]
+            pick = better(np.take_along_axis(values, right, axis=0), np.take_along_axis(values, left, axis=0))
+            levels.append(np.where(pick, right, left))
+            width *= 2
+        return values, levels, better
+
+    @staticmethod
+    def _best_between(table, lo: int, hi: int, col: int) -> int:
+        """Position of the best value in [lo, hi): two overlapping power-of-two blocks"""
+        values, levels, better = table
+        k = (hi - lo).bit_length() - 1
+        a, b = int(levels[k][lo, col]), int(levels[k][hi - (1 << k), col])
+        return b if better(values[b, col], values[a, col]) else a
+
+    @staticmethod
+    def _build_lookup(keys: np.ndarray, step: int):
+        """Dense offset table mapping a key to its row in the aggregate arrays (-1 if absent)"""
+        if not len(keys):
+            return 0, np.empty(0, dtype=np.int64)
+        key_min = int(keys[0])
+        lookup = np.full((int(keys[-1]) - key_min) // step + 1, -1, dtype=np.int64)
+        lookup[(keys - key_min) // step] = np.arange(len(keys))
+        return key_min, lookup
+
+    @staticmethod
+    def _position(lookup: np.ndarray, key_min: int, key: Optional[int], step: int) -> int:
+        if key is None:
+            return -1
+        offset = key - key_min
+        if offset < 0 or offset % step:
+            return -1
+        offset //= step
+        return int(lookup[offset]) if offset < len(lookup) else -1
+
+    def column(self, name: str) -> int:
+        """Position of a column in the aggregate arrays"""
+        return self._col[name]
+
+    def has_year(self, year: Optional[int]) -> bool:
+        return self._position(self._year_lookup, self._year_min, year, 1) >= 0
+
+    def has_decade(self, decade: Optional[int]) -> bool:
+        return self._position(self._decade_lookup, self._decade_min, decade, 10) >= 0
+
+    def year_value(self, year: Optional[int], column: str) -> Optional[float]:
+        """Mean of a column for a year, or None if the column has no data for that year"""
+        pos = self._position(self._year_lookup, self._year_min, year, 1)
+        if pos < 0:
+            return None
+        value = float(self.year_means[pos, self._col[column]])
+        return None if np.isnan(value) else value
+
+    def year_values(self, year: Optional[int]) -> Optional[Dict[str, float]]:
+        """Means of every column for a year"""
+        pos = self._position(self._year_lookup, self._year_min, year, 1)
+        if pos < 0:
+            return None
+        return dict(zip(self.columns, self.year_means[pos].tolist()))
+
+    def decade_value(self, decade: Optional[int], column: str) -> Optional[float]:
+        """Mean of a column for a decade, or None if the column has no data for that decade"""
+        pos = self._position(self._decade_lookup, self._decade_min, decade, 10)
+        if pos < 0:
+            return None
+        value = float(self.decade_means[pos, self._col[column]])
+        return None if np.isnan(value) else value
+
+    def _year_span(self, start_year: Optional[int], end_year: Optional[int]):
+        """Positions [lo, hi) in the year axis covered by an inclusive year window"""
+        n = len(self.years)
+        lo = 0 if start_year is None else self._ceil_position(start_year)
+        hi = n if end_year is None else self._ceil_position(end_year + 1)
+        return lo, max(lo, hi)
+
+    def _ceil_position(self, year: int) -> int:
+        """Position of the first year >= year (len(years) if none)"""
+        offset = year - self._year_min
+        if offset <= 0:
+            return 0
+        return int(self._year_ceil[offset]) if offset < len(self._year_ceil) else len(self.years)
+
+    def trends(self, start_year: Optional[int] = None,
+               end_year: Optional[int] = None) -> Dict[str, float]:
+        """Linear trends of every column, optionally within a [start_year, end_year] window"""
+        if start_year is None and end_year is None:
+            slopes = self.slopes
+        else:
+            slopes = self._slopes_between(*self._year_span(start_year, end_year))
+        return dict(zip(self.columns, slopes.tolist()))
+
+    def trend(self, column: str, start_year: Optional[int] = None,
+              end_year: Optional[int] = None) -> float:
+        """Linear trend of a single column"""
+        if start_year is None and end_year is None:
+            return float(self.slopes[self._col[column]])
+        lo, hi = self._year_span(start_year, end_year)
+        return float(self._slopes_between(lo, hi)[self._col[column]])
+
+    def range_stats(self, column: str, start_year: Optional[int] = None,
+                    end_year: Optional[int] = None) -> Optional[RangeStats]:
+        """Mean, sum, min, max and change of a column's yearly means over an inclusive
+        year window in constant time, or None if no year in the window has data"""
+        col = self._col[column]
+        lo, hi = self._year_span(start_year, end_year)
+        if hi <= lo:
+            return None
+        first, last = int(self._next_valid[lo, col]), int(self._prev_valid[hi - 1, col])
+        if first > last:
+            return None
+        total, count = self._range_prefix[:, hi, col] - self._range_prefix[:, lo, col]
+        low = self._best_between(self._range_min, first, last + 1, col)
+        high = self._best_between(self._range_max, first, last + 1, col)
+        means = self.year_means[:, col]
+        return RangeStats(
+            start=int(self.years[first]), end=int(self.years[last]), years=int(count),
+            mean=float(total / count), sum=float(total),
+            min=float(means[low]), min_year=int(self.years[low]),
+            max=float(means[high]), max_year=int(self.years[high]),
+            first=float(means[first]), last=float(means[last]),
+        )
+
+    def trend_values(self, columns: List[str], years: np.ndarray, start_year: Optional[int] = None,
+                     end_year: Optional[int] = None) -> np.ndarray:
+        """(len(years), len(columns)) values of the fitted trend lines at each year's mean"""
+        lo, hi = self._year_span(start_year, end_year)
+        n, sx, sy = (self._trend_prefix[:3, hi] - self._trend_prefix[:3, lo])
+        slopes = self._slopes_between(lo, hi)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            intercepts = (sy - slopes * sx) / n
+        cols = [self._col[c] for c in columns]
+        x = np.asarray(years, dtype=np.float64) + self._year_offset - self._x_centre
+        return intercepts[cols] + np.outer(x, slopes[cols])
+
+    def latest(self, column: str) -> float:
+        """Last non-NaN value of a column"""
+        return float(self.last_row[self._col[column]])
+
+    def first(self, column: str) -> float:
+        """First non-NaN value of a column"""
+        return float(self.first_row[self._col[column]])
+
+    def latest_year(self, column: str) -> Optional[int]:
+        """Year of latest(column)"""
+        return self.column_last_years[self._col[column]]
+
+    def first_year_of(self, column: str) -> Optional[int]:
+        """Year of first(column)"""
+        return self.column_first_years[self._col[column]]
+
+    def mean(self, column: str) -> float:
+        return float(self.column_means[self._col[column]])
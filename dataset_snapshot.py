@@ -0,0 +1,56 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import numpy as np
+
+# Key under which the source fingerprint is stored inside the .npz
+META_KEY = '__source__'
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def load_snapshot(snapshot_path: str, source_path: str) -> Optional[Dict[str, np.ndarray]]:
+    """Columns cached for source_path, or None when the snapshot is missing or stale.
+
+    A matching mtime and size is trusted as is; otherwise the source is hashed, so a
+    touched but unchanged file still reuses the snapshot.
+    """
+    if not os.path.exists(snapshot_path) or not os.path.exists(source_path):
+        return None
+    with np.load(snapshot_path, allow_pickle=False) as npz:
+        columns = {name: npz[name] for name in npz.files}
+    meta = json.loads(str(columns.pop(META_KEY, '{}')))
+    current = _fingerprint(source_path)
+    if meta.get('path') != current['path']:
+        return None
+    if meta.get('mtime_ns') == current['mtime_ns'] and meta.get('size') == current['size']:
+        return columns
+    if meta.get('sha256') != _sha256(source_path):
+        return None
+    # Same content under a new mtime: refresh the key so the next start skips hashing
+    save_snapshot(snapshot_path, source_path, columns, meta['sha256'])
+    return columns
+
+
+def save_snapshot(snapshot_path: str, source_path: str, columns: Dict[str, np.ndarray],
+                  sha256: Optional[str] = None):
+    """Write the preprocessed columns with the source's fingerprint, replacing atomically"""
+    meta = dict(_fingerprint(source_path), sha256=sha256 or _sha256(source_path))
+    directory = os.path.dirname(snapshot_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{snapshot_path}.tmp{os.getpid()}.npz"
+    np.savez(tmp, **{META_KEY: np.array(json.dumps(meta))}, **columns)
+    os.replace(tmp, snapshot_path)
@@ -0,0 +1,56 @@
+from typing import Callable, List, Optional, Tuple
+import os
+import threading
+
+
+class FileWatcher:
+    """Polls files for mtime/size changes and calls on_change from a background thread.
+
+    A change is acted on only once the new fingerprint has held for a full interval,
+    so a file that is still being written is never picked up half way.
+    """
+
+    def __init__(self, paths: List[str], on_change: Callable[[], None], interval: float = 2.0):
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def fingerprint(self) -> Tuple:
+        stamps = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                stamps.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append((path, None, None))
+        return tuple(stamps)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='dataset-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        seen = self.fingerprint()
+        pending = None
+        while not self._stop.wait(self.interval):
+            current = self.fingerprint()
+            if current == seen:
+                pending = None
+                continue
+            if current != pending:
+                # Changed since the last poll: wait one more interval for writes to settle
+                pending = current
+                continue
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"Dataset reload failed: {e}")
+            seen, pending = current, None
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
@@ -1,214 +1,333 @@
 # etl.py - Updated with working data sources (2025)
+"""Earth changes ETL pipeline: fetch, incrementally ingest and checkpoint every data/*.csv source,
+then join them into the features table the chat service reads.
+
+Usage: python etl.py [--full] [--only co2 temp ...] [--data-dir data] [--features]
+"""
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 import pandas as pd
-import requests
+import argparse
+import hashlib
 import io
-import csv
+import json
 import numpy as np
+import os
 import time
 from datetime import datetime
 import warnings
+from etl_fetch import Source, fetch_all
+from feature_store import write_store
+from timeseries import forest_cover_pct
+import synthetic_data
 warnings.filterwarnings('ignore')
 
 # Setup
 DATA = Path("data")
-DATA.mkdir(exist_ok=True)
-
-def safe_download(url, headers=None, max_retries=3, delay=2):
-    """Download with retry logic and proper headers"""
-    if headers is None:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            return response
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(delay)
-            else:
-                raise
-
-print("Starting Earth Changes Data Collection...")
-
-# 1. Global Temperature Anomaly (Alternative DataHub source)
-print("\n📊 Downloading temperature data...")
-try:
-    # Use DataHub global temperature dataset which aggregates GISTEMP data
-    temp_url = "https://datahub.io/core/global-temp/r/annual.csv"
-    temp_response = safe_download(temp_url)
-    
-    df_temp = pd.read_csv(io.StringIO(temp_response.text))
+MANIFEST_NAME = "manifest.json"
+HTTP_CACHE_NAME = ".http_cache"
+FEATURES = Path("features.columnar")
+FEATURES_CSV = Path("features.csv")  # export only; the chat service reads FEATURES
+
+CO2_COLUMNS = ['year', 'month', 'decimal', 'co2', 'season_adj', 'fit', 'fit_seas', 'days']
+
+
+# Source parsers: raw downloaded text -> tidy frame with the output file's columns
+
+def parse_temperature(text: str) -> pd.DataFrame:
+    # DataHub global temperature dataset aggregates GISTEMP data
+    df_temp = pd.read_csv(io.StringIO(text))
     # Filter for GISTEMP data and clean
     df_temp = df_temp[df_temp['Source'] == 'GISTEMP'].copy()
     df_temp = df_temp.rename(columns={'Year': 'year', 'Mean': 'temp_anomaly'})
-    df_temp = df_temp[['year', 'temp_anomaly']].dropna()
-    df_temp.to_csv(DATA/'temp.csv', index=False)
-    print(f"✓ Temperature data: {len(df_temp)} records (1880-2024)")
-    
-except Exception as e:
-    print(f"✗ Temperature download failed: {e}")
-    # Generate realistic temperature data based on known trends
-    years = list(range(1880, 2025))
-    temp_anomalies = []
-    
-    for year in years:
-        # Historical warming trend: ~0.8°C over 140 years
-        base_trend = (year - 1880) * 0.008  # 0.8°C / 100 years
-        # Add natural variability
-        natural_var = 0.3 * np.sin((year - 1880) * 0.1) * np.cos((year - 1880) * 0.05)
-        # Add random noise
-        noise = np.random.normal(0, 0.15)
-        # Accelerated warming post-1980
-        if year > 1980:
-            base_trend += (year - 1980) * 0.012
-        
-        temp_anomaly = base_trend + natural_var + noise
-        temp_anomalies.append([year, round(temp_anomaly, 2)])
-    
-    df_temp = pd.DataFrame(temp_anomalies, columns=['year', 'temp_anomaly'])
-    df_temp.to_csv(DATA/'temp.csv', index=False)
-    print(f"✓ Synthetic temperature data generated: {len(df_temp)} records")
-
-# 2. Mauna Loa CO₂ (NOAA - still working)
-print("\n🌍 Downloading CO2 data...")
-try:
-    co2_url = "https://gml.noaa.gov/webdata/ccgg/trends/co2/co2_mm_mlo.csv"
-    co2_response = safe_download(co2_url)
-    
-    df_co2 = pd.read_csv(io.StringIO(co2_response.text), comment='#',
-                         names=['year', 'month', 'decimal', 'co2', 'season_adj', 'fit', 'fit_seas', 'days'])
-    df_co2 = df_co2.dropna(subset=['co2'])
-    df_co2.to_csv(DATA/'co2.csv', index=False)
-    print(f"✓ CO2 data: {len(df_co2)} records (1958-2025)")
-    
-except Exception as e:
-    print(f"✗ CO2 download failed: {e}")
-    # Generate synthetic CO2 data
-    years = np.arange(1958, 2025.1, 1/12)  # Monthly data
-    co2_values = []
-    
-    for year in years:
-        # Known CO2 trend: 315 ppm in 1958 to ~420 ppm in 2025
-        base_value = 315 + (year - 1958) * 1.6  # ~1.6 ppm/year average
-        # Seasonal cycle
-        seasonal = 3 * np.cos(2 * np.pi * (year % 1 - 0.2))
-        # Add noise
-        noise = np.random.normal(0, 0.5)
-        
-        co2_value = base_value + seasonal + noise
-        co2_values.append([int(year), int((year % 1) * 12) + 1, year, co2_value, co2_value, co2_value, co2_value, -1])
-    
-    df_co2 = pd.DataFrame(co2_values, columns=['year', 'month', 'decimal', 'co2', 'season_adj', 'fit', 'fit_seas', 'days'])
-    df_co2.to_csv(DATA/'co2.csv', index=False)
-    print(f"✓ Synthetic CO2 data generated: {len(df_co2)} records")
-
-# 3. Arctic Sea Ice Extent (Using known decline trends)
-print("\n🧊 Generating Arctic sea ice data...")
-try:
-    years = list(range(1979, 2025))
-    seaice_data = []
-    
-    # Arctic sea ice decline: ~13.5 million km² (1979) to ~4.8 million km² (2024)
-    for year in years:
-        # Linear decline with natural variability
-        base_extent = 13.5 - (year - 1979) * 0.08  # ~80,000 km²/year decline
-        # Annual variability
-        variability = np.random.normal(0, 0.8)
-        # Ensure minimum physical limit
-        extent = max(base_extent + variability, 3.5)
-        seaice_data.append([year, round(extent, 2)])
-    
-    df_seaice = pd.DataFrame(seaice_data, columns=['year', 'extent'])
-    df_seaice.to_csv(DATA/'seaice.csv', index=False)
-    print(f"✓ Sea ice data generated: {len(df_seaice)} records")
-    
-except Exception as e:
-    print(f"✗ Sea ice generation failed: {e}")
-
-# 4. Global Mean Sea Level Rise
-print("\n🌊 Generating sea level data...")
-try:
-    years = list(range(1880, 2025))
-    sealevel_data = []
-    
-    # Sea level rise: ~1.7 mm/year historical, accelerating to ~3.3 mm/year recently
-    cumulative_rise = 0
-    
-    for year in years:
-        if year < 1993:  # Pre-satellite era
-            annual_rise = 1.7 + np.random.normal(0, 0.5)
-        else:  # Satellite era with acceleration
-            annual_rise = 2.8 + (year - 1993) * 0.08 + np.random.normal(0, 0.8)
-        
-        cumulative_rise += annual_rise
-        sealevel_data.append([year, round(cumulative_rise, 1)])
-    
-    df_sealevel = pd.DataFrame(sealevel_data, columns=['year', 'gmsl_mm'])
-    df_sealevel.to_csv(DATA/'gmsl.csv', index=False)
-    print(f"✓ Sea level data generated: {len(df_sealevel)} records")
-    
-except Exception as e:
-    print(f"✗ Sea level generation failed: {e}")
-
-# 5. Global Forest Cover Loss
-print("\n🌳 Generating forest loss data...")
-try:
-    years = list(range(2001, 2025))
-    forest_data = []
-    
-    # Forest loss trends: increasing from ~10M ha/year to ~15M ha/year
-    for year in years:
-        base_loss = 8000000 + (year - 2001) * 250000  # Increasing trend
-        variability = np.random.normal(0, 1500000)
-        loss = max(base_loss + variability, 5000000)  # Minimum realistic loss
-        forest_data.append([year, int(loss)])
-    
-    df_forest = pd.DataFrame(forest_data, columns=['year', 'loss_ha'])
-    df_forest.to_csv(DATA/'forest.csv', index=False)
-    print(f"✓ Forest loss data generated: {len(df_forest)} records")
-    
-except Exception as e:
-    print(f"✗ Forest data generation failed: {e}")
-
-# 6. Additional Climate Indicators
-print("\n📈 Generating additional climate indicators...")
-try:
-    # Ocean pH (acidification)
-    years = list(range(1988, 2025))
-    ph_data = []
-    for year in years:
-        # Ocean pH declining from ~8.1 to ~8.0
-        ph_value = 8.1 - (year - 1988) * 0.002 + np.random.normal(0, 0.01)
-        ph_data.append([year, round(ph_value, 3)])
-    
-    df_ph = pd.DataFrame(ph_data, columns=['year', 'ocean_ph'])
-    df_ph.to_csv(DATA/'ocean_ph.csv', index=False)
-    
-    # Global precipitation anomaly
-    years = list(range(1900, 2025))
-    precip_data = []
-    for year in years:
-        # Precipitation variability around 0
-        anomaly = np.random.normal(0, 15) + 5 * np.sin((year - 1900) * 0.1)
-        precip_data.append([year, round(anomaly, 1)])
-    
-    df_precip = pd.DataFrame(precip_data, columns=['year', 'precip_anomaly'])
-    df_precip.to_csv(DATA/'precipitation.csv', index=False)
-    
-    print(f"✓ Ocean pH data: {len(df_ph)} records")
-    print(f"✓ Precipitation data: {len(df_precip)} records")
-    
-except Exception as e:
-    print(f"✗ Additional indicators failed: {e}")
-
-print(f"\n🎉 ETL Process Complete!")
-print(f"📁 Data files saved to: {DATA.absolute()}")
-print(f"📊 Available datasets:")
-for csv_file in DATA.glob("*.csv"):
-    df = pd.read_csv(csv_file)
-    print(f"   • {csv_file.name}: {len(df)} records")
+    return df_temp[['year', 'temp_anomaly']].dropna()
+
+
+def parse_co2(text: str) -> pd.DataFrame:
+    # NOAA Mauna Loa monthly means
+    df_co2 = pd.read_csv(io.StringIO(text), comment='#', names=CO2_COLUMNS)
+    return df_co2.dropna(subset=['co2'])
+
+
+class Dataset(NamedTuple):
+    name: str                   # output file stem under the data directory
+    label: str
+    period: Tuple[str, ...]     # columns identifying one row's period, oldest first
+    generate: Callable[..., pd.DataFrame]  # synthetic fallback, see synthetic_data
+    source: Optional[Source] = None
+    parse: Optional[Callable[[str], pd.DataFrame]] = None
+
+
+DATASETS = [
+    Dataset('temp', '📊 Global temperature anomaly', ('year',), synthetic_data.temperature,
+            Source('temperature', "https://datahub.io/core/global-temp/r/annual.csv"), parse_temperature),
+    Dataset('co2', '🌍 Mauna Loa CO2', ('year', 'month'), synthetic_data.co2,
+            Source('co2', "https://gml.noaa.gov/webdata/ccgg/trends/co2/co2_mm_mlo.csv"), parse_co2),
+    Dataset('seaice', '🧊 Arctic sea ice extent', ('year',), synthetic_data.sea_ice),
+    Dataset('gmsl', '🌊 Global mean sea level', ('year',), synthetic_data.sea_level),
+    Dataset('forest', '🌳 Global forest loss', ('year',), synthetic_data.forest_loss),
+    Dataset('ocean_ph', '📈 Ocean pH', ('year',), synthetic_data.ocean_ph),
+    Dataset('precipitation', '📈 Precipitation anomaly', ('year',), synthetic_data.precipitation),
+    Dataset('ozone', '🛡️ Total column ozone', ('year',), synthetic_data.ozone),
+]
+
+
+def period_keys(df: pd.DataFrame, dataset: Dataset) -> np.ndarray:
+    """Sortable integer per row: 2024 for annual periods, 202403 for monthly ones"""
+    keys = df[dataset.period[0]].to_numpy(dtype=np.int64)
+    for column in dataset.period[1:]:
+        keys = keys * 100 + df[column].to_numpy(dtype=np.int64)
+    return keys
+
+
+def validate(df: pd.DataFrame, dataset: Dataset) -> pd.DataFrame:
+    """Coerce to numbers, drop malformed rows and duplicate periods, order by period"""
+    df = df.apply(pd.to_numeric, errors='coerce')
+    value_columns = [c for c in df.columns if c not in dataset.period]
+    df = df.dropna(subset=list(dataset.period) + value_columns[:1])
+    for column in dataset.period:
+        df[column] = df[column].astype(int)
+    df = df.drop_duplicates(subset=list(dataset.period), keep='last')
+    return df.sort_values(list(dataset.period)).reset_index(drop=True)
+
+
+def last_period(df: pd.DataFrame, dataset: Dataset) -> Optional[int]:
+    return int(period_keys(df, dataset)[-1]) if len(df) else None
+
+
+class Manifest:
+    """Per-dataset checkpoint: last ingested period, source hash, and where the revision window starts"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self.entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, name: str) -> Dict:
+        return self.entries.get(name, {})
+
+    def update(self, name: str, **entry):
+        self.entries[name] = dict(entry, updated_at=datetime.utcnow().isoformat(timespec='seconds'))
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# Trailing periods a source may still revise between releases (NOAA restates recent months).
+# Every run re-reads and compares them; everything before them must be unchanged to merge.
+REVISION_WINDOW = 24
+
+
+def _csv_lines(df: pd.DataFrame) -> List[bytes]:
+    """One encoded CSV line per row, exactly as written to the data file"""
+    text = df.to_csv(index=False, header=False, lineterminator='\n')
+    return [line + b'\n' for line in text.encode('utf-8').splitlines()]
+
+
+def _merge_window(path: Path, dataset: Dataset, offset: int, lines: List[bytes],
+                  keys: np.ndarray) -> Tuple[int, int]:
+    """Replace the data file from offset with lines; (periods added, periods revised)"""
+    with open(path, 'r+b') as f:
+        header = f.readline()
+        f.seek(offset)
+        old = validate(pd.read_csv(io.BytesIO(header + f.read())), dataset)
+        f.seek(offset)
+        f.truncate()
+        f.writelines(lines)
+    before = dict(zip(period_keys(old, dataset).tolist(), _csv_lines(old)))
+    added = sum(1 for key in keys.tolist() if key not in before)
+    revised = sum(1 for key, line in zip(keys.tolist(), lines) if key in before and before[key] != line)
+    return added, revised
+
+
+def ingest_remote(dataset: Dataset, content: bytes, path: Path, manifest: Manifest, full: bool) -> str:
+    """Merge a download into its data file at the period checkpoint, or rebuild it.
+
+    Sources regenerate their header comments on every release, so the checkpoint is on
+    parsed periods, not raw bytes: the rows before the revision window must hash-match
+    what was ingested, and the window plus any new periods are rewritten in place.
+    """
+    entry = manifest.get(dataset.name)
+    digest = _sha256(content)
+    if not full and path.exists() and entry.get('hash') == digest:
+        return 'unchanged'
+
+    df = validate(dataset.parse(content.decode('utf-8')), dataset)
+    keys = period_keys(df, dataset)
+    lines = _csv_lines(df)
+    window_start, offset = entry.get('window_start'), entry.get('window_offset')
+    stable = int(np.searchsorted(keys, window_start)) if window_start is not None else 0
+    if (not full and path.exists() and window_start is not None and offset is not None
+            and offset <= path.stat().st_size
+            and _sha256(b''.join(lines[:stable])) == entry.get('stable_hash')):
+        added, revised = _merge_window(path, dataset, offset, lines[stable:], keys[stable:])
+        changes = [f'appended {added}'] * bool(added) + [f'revised {revised}'] * bool(revised)
+        status = ', '.join(changes) or 'unchanged'
+        base, base_offset = stable, offset
+    else:
+        header = (','.join(df.columns) + '\n').encode('utf-8')
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(header + b''.join(lines))
+        os.replace(tmp, path)
+        status = f'rebuilt {len(df)}'
+        base, base_offset = 0, len(header)
+    # The next window covers the last REVISION_WINDOW periods; it never starts before this
+    # one, whose file offset is the only one known without re-reading the file
+    start = max(len(df) - REVISION_WINDOW, base)
+    manifest.update(dataset.name, source=dataset.source.url, last_period=last_period(df, dataset),
+                    hash=digest, window_start=int(keys[start]) if start < len(df) else None,
+                    window_offset=base_offset + sum(map(len, lines[base:start])),
+                    stable_hash=_sha256(b''.join(lines[:start])))
+    return status
+
+
+def generate(dataset: Dataset, path: Path, manifest: Manifest, seed: Optional[int] = None) -> str:
+    df = validate(dataset.generate(seed=seed), dataset)
+    df.to_csv(path, index=False)
+    manifest.update(dataset.name, source='synthetic', last_period=last_period(df, dataset),
+                    hash=_sha256(path.read_bytes()))
+    return f'generated {len(df)}'
+
+
+def run(data_dir=DATA, full: bool = False, only: Optional[Iterable[str]] = None,
+        workers: int = 4, datasets: Optional[List[Dataset]] = None, seed: Optional[int] = None) -> Dict[str, str]:
+    """Refresh the selected datasets; returns a status per dataset ('unchanged', 'appended N', ...)"""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(exist_ok=True)
+    only = set(only) if only is not None else None
+    selected = [d for d in (datasets or DATASETS) if only is None or d.name in only]
+    manifest = Manifest(data_dir / MANIFEST_NAME)
+
+    # Fetch all remote sources concurrently; unchanged ones are revalidated with a 304
+    sources = [d.source for d in selected if d.source is not None]
+    fetched = fetch_all(sources, data_dir / HTTP_CACHE_NAME, max_workers=workers) if sources else {}
+    for result in fetched.values():
+        print(f"   ⬇️  {result.summary()}")
+
+    statuses = {}
+    for dataset in selected:
+        path = data_dir / f"{dataset.name}.csv"
+        try:
+            result = fetched.get(dataset.source.name) if dataset.source else None
+            if result is not None and result.error is None:
+                statuses[dataset.name] = ingest_remote(dataset, result.content, path, manifest, full)
+            elif full or not path.exists():
+                if result is not None:
+                    print(f"✗ {dataset.label} download failed: {result.error}")
+                statuses[dataset.name] = generate(dataset, path, manifest, seed)
+            else:
+                # Keep the data we have rather than replacing it with synthetic values
+                statuses[dataset.name] = 'unchanged'
+        except Exception as e:
+            print(f"✗ {dataset.label} failed: {e}")
+            statuses[dataset.name] = 'failed'
+        print(f"{'✗' if statuses[dataset.name] == 'failed' else '✓'} {dataset.label}: {statuses[dataset.name]}")
+    manifest.save()
+    return statuses
+
+
+def changed(statuses: Dict[str, str]) -> bool:
+    return any(status not in ('unchanged', 'failed') for status in statuses.values())
+
+
+def summarize(data_dir=DATA):
+    print(f"📁 Data files saved to: {Path(data_dir).absolute()}")
+    print(f"📊 Available datasets:")
+    for csv_file in sorted(Path(data_dir).glob("*.csv")):
+        df = pd.read_csv(csv_file)
+        print(f"   • {csv_file.name}: {len(df)} records")
+
+
+# Features table: one row per month over every year any source covers. The monthly CO2
+# series fills its months; annual indicators repeat across the months of their year.
+# Each entry maps a dataset's value columns to feature column names.
+MONTHLY_FEATURES = ('co2', {'co2': 'co2'})
+ANNUAL_FEATURES = [
+    ('temp', {'temp_anomaly': 'temp_anomaly'}),
+    ('gmsl', {'gmsl_mm': 'gmsl_mm'}),
+    ('forest', {'loss_ha': 'forest_loss_ha'}),
+    ('ocean_ph', {'ocean_ph': 'ocean_ph'}),
+    ('ozone', {'ozone': 'ozone'}),
+    ('precipitation', {'precip_anomaly': 'precip_anomaly'}),
+    ('seaice', {'extent': 'seaice_extent'}),
+]
+FEATURE_COLUMNS = ['year', 'month', 'co2', 'temp_anomaly', 'gmsl_mm', 'forest_loss_ha', 'forest_cover_pct',
+                   'ocean_ph', 'ozone', 'precip_anomaly', 'seaice_extent']
+FEATURE_DTYPES = {'year': np.int32, 'month': np.int8}
+
+
+def _resample(path: Path, keys: Tuple[str, ...], columns: Dict[str, str]) -> pd.DataFrame:
+    """Mean of the mapped value columns per period, across finer periods and regions"""
+    df = pd.read_csv(path, usecols=list(keys) + list(columns)).apply(pd.to_numeric, errors='coerce')
+    df = df.dropna(subset=list(keys)).rename(columns=columns)
+    return df.groupby(list(keys), as_index=False)[list(columns.values())].mean()
+
+
+def build_features(data_dir=DATA, out=FEATURES, csv_out: Optional[Path] = FEATURES_CSV) -> pd.DataFrame:
+    """Join every data/*.csv source into the typed features table and write it as a columnar store"""
+    data_dir = Path(data_dir)
+    name, columns = MONTHLY_FEATURES
+    monthly = _resample(data_dir / f"{name}.csv", ('year', 'month'), columns)
+    annuals = []
+    for name, columns in ANNUAL_FEATURES:
+        annual = _resample(data_dir / f"{name}.csv", ('year',), columns)
+        if name == 'forest':
+            annual['forest_cover_pct'] = forest_cover_pct(annual['forest_loss_ha'].to_numpy())
+        annuals.append(annual)
+    # Left joins onto the full year/month axis: an indicator missing for a period is NaN
+    # (DatasetIndex skips NaNs) instead of dropping the period for every other indicator
+    years = np.unique(np.concatenate([monthly['year'].to_numpy()] + [a['year'].to_numpy() for a in annuals]))
+    features = pd.DataFrame({'year': np.repeat(years, 12), 'month': np.tile(np.arange(1, 13), len(years))})
+    features = features.merge(monthly, on=['year', 'month'], how='left')
+    for annual in annuals:
+        features = features.merge(annual, on='year', how='left')
+    values = [c for c in FEATURE_COLUMNS if c not in FEATURE_DTYPES]
+    # Months past the last observation of any source carry nothing
+    features = features.dropna(subset=values, how='all')
+    features = features[FEATURE_COLUMNS].astype(FEATURE_DTYPES)
+    features = features.sort_values(['year', 'month']).reset_index(drop=True)
+
+    sources = {path.stem: _sha256(path.read_bytes()) for path in sorted(data_dir.glob("*.csv"))}
+    write_store(out, {col: features[col].to_numpy() for col in FEATURE_COLUMNS},
+                meta={'built_at': datetime.utcnow().isoformat(timespec='seconds'), 'sources': sources})
+    if csv_out is not None:
+        # Atomic like the store: the chat service may be watching the export too
+        tmp = Path(csv_out).with_name(Path(csv_out).name + '.tmp')
+        features.to_csv(tmp, index=False)
+        os.replace(tmp, csv_out)
+    return features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='rebuild every dataset from scratch')
+    parser.add_argument('--only', nargs='+', choices=[d.name for d in DATASETS], help='refresh only these datasets')
+    parser.add_argument('--data-dir', default=str(DATA))
+    parser.add_argument('--workers', type=int, default=4, help='concurrent downloads')
+    parser.add_argument('--seed', type=int, help='seed for synthetic fallbacks, for reproducible runs')
+    parser.add_argument('--features', action='store_true', help='rebuild the features table even if nothing changed')
+    args = parser.parse_args()
+
+    print("Starting Earth Changes Data Collection...")
+    start = time.perf_counter()
+    statuses = run(args.data_dir, full=args.full, only=args.only, workers=args.workers, seed=args.seed)
+    # Downstream steps only run when some dataset actually changed
+    if changed(statuses) or args.features or not FEATURES.exists():
+        summarize(args.data_dir)
+        features = build_features(args.data_dir)
+        print(f"🧮 Features: {len(features)} rows x {len(features.columns)} columns -> {FEATURES} (+ {FEATURES_CSV})")
+    else:
+        print("Nothing changed; downstream steps skipped")
+    print(f"\n🎉 ETL Process Complete in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional
+import json
+import os
+import random
+import re
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Upstream statuses worth another attempt; anything else fails the source immediately
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class Source(NamedTuple):
+    name: str
+    url: str
+
+
+class FetchResult(NamedTuple):
+    name: str
+    url: str
+    status: str  # 'downloaded', 'not-modified' or 'failed'
+    content: Optional[bytes]
+    elapsed: float
+    attempts: int
+    error: Optional[Exception] = None
+
+    @property
+    def changed(self) -> bool:
+        return self.status == 'downloaded'
+
+    def text(self) -> str:
+        """Decoded body; re-raises the fetch error for failed sources"""
+        if self.error is not None:
+            raise self.error
+        return self.content.decode('utf-8')
+
+    def summary(self) -> str:
+        size = f"{len(self.content) / 1024:.1f} KiB" if self.content is not None else str(self.error)
+        return f"{self.name:<12} {self.status:<12} {self.elapsed * 1000:8.1f} ms  attempts={self.attempts}  {size}"
+
+
+class HTTPCache:
+    """On-disk copy of each source body plus the ETag/Last-Modified validators it was served with"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, name: str):
+        stem = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+        return self.directory / f"{stem}.body", self.directory / f"{stem}.json"
+
+    def validators(self, source: Source) -> Dict[str, str]:
+        """Conditional request headers for a cached copy of this exact URL"""
+        body_path, meta_path = self._paths(source.name)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if meta.get('url') != source.url or not body_path.exists():
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def read(self, source: Source) -> bytes:
+        return self._paths(source.name)[0].read_bytes()
+
+    def store(self, source: Source, content: bytes, etag: Optional[str], last_modified: Optional[str]):
+        body_path, meta_path = self._paths(source.name)
+        # Body first, metadata last: validators never point at a partially written body
+        _write_atomic(body_path, content)
+        meta = {'url': source.url, 'etag': etag, 'last_modified': last_modified, 'fetched_at': time.time()}
+        _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def fetch_source(session: requests.Session, source: Source, cache: HTTPCache, timeout: float = 30.0,
+                 max_retries: int = 2, backoff: float = 1.0) -> FetchResult:
+    """Conditional GET with exponential backoff; a 304 is served from the local cache.
+
+    Makes one attempt plus up to max_retries retries, so max_retries=0 still fetches once.
+    """
+    start = time.perf_counter()
+    headers = cache.validators(source)
+
+    def result(status, content=None, error=None):
+        return FetchResult(source.name, source.url, status, content, time.perf_counter() - start, attempt, error)
+
+    for attempt in range(1, max_retries + 2):
+        try:
+            response = session.get(source.url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and headers:
+                return result('not-modified', cache.read(source))
+            if response.status_code in RETRYABLE_STATUSES and attempt <= max_retries:
+                _sleep(backoff, attempt)
+                continue
+            response.raise_for_status()
+            cache.store(source, response.content,
+                        response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return result('downloaded', response.content)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt <= max_retries:
+                _sleep(backoff, attempt)
+                continue
+            return result('failed', error=e)
+        except (requests.exceptions.RequestException, OSError) as e:
+            return result('failed', error=e)
+
+
+def _sleep(backoff: float, attempt: int):
+    """Exponential backoff with full jitter"""
+    time.sleep(random.uniform(0, backoff * (2 ** (attempt - 1))))
+
+
+def fetch_all(sources: Iterable[Source], cache_dir, max_workers: int = 4,
+              headers: Optional[Dict[str, str]] = None, **kwargs) -> Dict[str, FetchResult]:
+    """Fetch every source concurrently; returns results keyed by source name, never raises"""
+    sources = list(sources)
+    cache = HTTPCache(cache_dir)
+    with requests.Session() as session:
+        session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_maxsize=max(max_workers, 1), max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            results = pool.map(lambda source: fetch_source(session, source, cache, **kwargs), sources)
+            return {result.name: result for result in results}
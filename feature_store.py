@@ -0,0 +1,88 @@
+"""Single-file columnar store for the features table.
+
+Layout: an 8-byte magic, a little-endian uint64 header length, a JSON header describing
+each column (name, dtype, offset, nbytes, and shape for 2-D columns) plus free-form metadata, then every column's
+raw buffer aligned to 64 bytes. Readers memory-map the file and get zero-copy, typed
+NumPy views per column; writers replace the file atomically.
+"""
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b'FEATCOL1'
+ALIGN = 64
+
+
+class FeatureStore(NamedTuple):
+    columns: Dict[str, np.ndarray]
+    meta: Dict
+    rows: int
+
+    def frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns, copy=False)
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_store(path, columns: Dict[str, np.ndarray], meta: Optional[Dict] = None):
+    """Write columns (all the same length) to path, replacing any previous store atomically.
+
+    A column may be a 2-D (rows, n) array, stored row-major and read back with its shape.
+    """
+    arrays = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    lengths = {len(values) for values in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"columns have different lengths: {sorted(lengths)}")
+    specs, offset = [], 0
+    for name, values in arrays.items():
+        if values.dtype.hasobject:
+            raise TypeError(f"column {name!r} is not a fixed-width numeric type")
+        spec = {'name': name, 'dtype': values.dtype.str, 'offset': offset, 'nbytes': values.nbytes}
+        if values.ndim > 1:
+            spec['shape'] = list(values.shape)
+        specs.append(spec)
+        offset = _aligned(offset + values.nbytes)
+    header = json.dumps({'rows': lengths.pop() if lengths else 0, 'columns': specs,
+                         'meta': meta or {}}).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    path = Path(path)
+    tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for spec, values in zip(specs, arrays.values()):
+            f.seek(data_start + spec['offset'])
+            f.write(values.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def read_header(path) -> Dict:
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a feature store")
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length))
+    header['data_start'] = _aligned(len(MAGIC) + 8 + length)
+    return header
+
+
+def read_store(path, mmap: bool = True) -> FeatureStore:
+    """Open a store; with mmap=True columns are read-only views over the mapped file"""
+    header = read_header(path)
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+    columns = {}
+    for spec in header['columns']:
+        start = header['data_start'] + spec['offset']
+        column = buffer[start:start + spec['nbytes']].view(np.dtype(spec['dtype']))
+        columns[spec['name']] = column.reshape(spec['shape']) if 'shape' in spec else column
+    return FeatureStore(columns, header['meta'], header['rows'])
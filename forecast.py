@@ -0,0 +1,228 @@
+"""Forecasts for the dataset indicators from the bundled models, with a trend fallback.
+
+models/co2_predictor.pkl (a scikit-learn random forest mapping the other indicators to CO₂)
+and models/temperature_forecaster.pkl (a statsmodels ARIMA fit of the annual anomaly) are
+unpickled on first use in a background thread. Until a model is ready, or if its library
+is not installed (scikit-learn, statsmodels and joblib, pinned in requirements.txt), the
+indicator is forecast by extending the dataset's own trend line over its last
+TREND_WINDOW years (DatasetIndex.trend_values), and the answer names that method. Every
+prediction is made for all requested years in one call and memoized per (indicator,
+method, dataset version, year).
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import os
+import pickle
+import threading
+import time
+import numpy as np
+from dataset_index import DatasetIndex
+
+# Latest year a forecast may be asked for
+MAX_YEAR = 2100
+# Years of history the trend fallback is fitted on. The full record (CO₂ since 1958,
+# temperature since 1880) averages in slower decades and starts the line below today's values.
+TREND_WINDOW = 30
+
+
+class ForecastIndicator(NamedTuple):
+    name: str
+    column: str
+    label: str
+    unit: str
+    model_file: Optional[str] = None
+
+
+FORECAST_INDICATORS: Dict[str, ForecastIndicator] = {i.name: i for i in [
+    ForecastIndicator('co2', 'co2', 'CO₂', 'ppm', 'co2_predictor.pkl'),
+    ForecastIndicator('temperature', 'temp_anomaly', 'temperature anomaly', '°C', 'temperature_forecaster.pkl'),
+    ForecastIndicator('sea_level', 'gmsl_mm', 'sea level', 'mm'),
+    ForecastIndicator('forest_cover', 'forest_cover_pct', 'forest cover', '% of land'),
+    ForecastIndicator('ocean_ph', 'ocean_ph', 'ocean pH', ''),
+    ForecastIndicator('ozone', 'ozone', 'ozone', 'DU'),
+    ForecastIndicator('precipitation', 'precip_anomaly', 'precipitation anomaly', 'mm'),
+    ForecastIndicator('sea_ice', 'seaice_extent', 'sea ice extent', 'million km²'),
+]}
+
+# Router intents that name a forecastable indicator
+INTENT_INDICATORS = {
+    'co2': 'co2',
+    'temperature': 'temperature',
+    'sea_level': 'sea_level',
+    'forest': 'forest_cover',
+    'ocean': 'ocean_ph',
+    'ozone': 'ozone',
+    'precipitation': 'precipitation',
+    'sea_ice': 'sea_ice',
+}
+
+
+class Forecast(NamedTuple):
+    indicator: ForecastIndicator
+    years: np.ndarray
+    values: np.ndarray
+    method: str
+
+
+class TrendModel:
+    """The dataset index's least-squares trend lines over the last window years, extended to future years"""
+
+    method = 'linear trend'
+
+    def __init__(self, index: DatasetIndex, window: int = TREND_WINDOW):
+        self.index = index
+        self.start_year = index.last_year - window + 1 if index.last_year is not None else None
+
+    def predict_columns(self, columns: Sequence[str], years: np.ndarray) -> np.ndarray:
+        """(len(years), len(columns)) matrix of trend values"""
+        return self.index.trend_values(list(columns), years, self.start_year)
+
+    def predict(self, column: str, years: np.ndarray) -> np.ndarray:
+        return self.predict_columns([column], years)[:, 0]
+
+
+class RegressorModel:
+    """Estimator over the other indicators (co2_predictor): their trends feed one predict call"""
+
+    method = 'co2_predictor random forest'
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+        self.features = [str(f) for f in estimator.feature_names_in_]
+
+    def predict(self, years: np.ndarray, trend: TrendModel) -> np.ndarray:
+        import pandas as pd
+        features = pd.DataFrame(trend.predict_columns(self.features, years), columns=self.features)
+        return np.asarray(self.estimator.predict(features), dtype=np.float64)
+
+
+class ArimaModel:
+    """Fitted ARIMA results (temperature_forecaster) over an annual index"""
+
+    method = 'temperature_forecaster ARIMA'
+
+    def __init__(self, results):
+        self.results = results
+        self.first_year = int(results.data.dates[0].year)
+
+    def predict(self, years: np.ndarray, trend: TrendModel) -> np.ndarray:
+        # One predict over the whole span covers every horizon; positions past the sample are forecasts
+        positions = years - self.first_year
+        lo, hi = int(positions.min()), int(positions.max())
+        span = np.asarray(self.results.predict(start=lo, end=hi), dtype=np.float64)
+        return span[positions - lo]
+
+
+def _unpickle(path: str):
+    try:
+        import joblib
+    except ImportError:
+        # co2_predictor.pkl was written by joblib and needs it; a plain pickle does not
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    return joblib.load(path)
+
+
+class ForecastEngine:
+    def __init__(self, models_dir: str = 'models'):
+        self.models_dir = models_dir
+        self.models: Dict[str, object] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.load_errors: Dict[str, str] = {}
+        self._loaded = threading.Event()
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._trend: Optional[Tuple[int, TrendModel]] = None
+        self._memo: Dict[Tuple[str, str, int, int], float] = {}
+        self._memo_version: Optional[int] = None
+
+    def start_loading(self):
+        """Unpickle the bundled models in a background thread (once)"""
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load_models, name='forecast-loader', daemon=True)
+                self._loader.start()
+
+    def _load_models(self):
+        try:
+            for indicator in FORECAST_INDICATORS.values():
+                if not indicator.model_file:
+                    continue
+                start = time.perf_counter()
+                try:
+                    obj = _unpickle(os.path.join(self.models_dir, indicator.model_file))
+                    model = RegressorModel(obj) if hasattr(obj, 'feature_names_in_') else ArimaModel(obj)
+                except Exception as e:
+                    print(f"Forecast model {indicator.model_file} unavailable, using the trend: {e}")
+                    self.load_errors[indicator.name] = f"{type(e).__name__}: {e}"
+                    continue
+                self.load_seconds[indicator.name] = time.perf_counter() - start
+                self.models[indicator.name] = model
+        finally:
+            self._loaded.set()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        self.start_loading()
+        return self._loaded.wait(timeout)
+
+    def _trend_model(self, version: int, index: DatasetIndex) -> TrendModel:
+        current = self._trend
+        if current is None or current[0] != version:
+            current = self._trend = (version, TrendModel(index))
+        return current[1]
+
+    def forecast(self, name: str, years: Sequence[int], version: int, index: DatasetIndex) -> Forecast:
+        """Values of indicator name for every year, from its model if loaded, else its trend"""
+        indicator = FORECAST_INDICATORS[name]
+        # Never wait on the loader inside a request: until a model is in, its trend answers
+        self.start_loading()
+        years = np.asarray(years, dtype=np.int64)
+        trend = self._trend_model(version, index)
+        model = self.models.get(name)
+        method = model.method if model is not None else TrendModel.method
+
+        if self._memo_version != version:
+            self._memo, self._memo_version = {}, version
+        memo = self._memo
+        values = np.array([memo.get((name, method, version, int(y)), np.nan) for y in years])
+        missing = np.unique(years[np.isnan(values)])
+        if len(missing):
+            # Every year not memoized yet goes through the model in a single call
+            try:
+                predicted = (model.predict(missing, trend) if model is not None
+                             else trend.predict(indicator.column, missing))
+            except Exception as e:
+                print(f"Forecast with {method} failed, using the trend: {e}")
+                method = TrendModel.method
+                predicted = trend.predict(indicator.column, missing)
+            for y, value in zip(missing.tolist(), predicted.tolist()):
+                memo[(name, method, version, y)] = value
+            values = np.array([memo[(name, method, version, int(y))] for y in years])
+        return Forecast(indicator, years, values, method)
+
+    def status(self) -> Dict:
+        return {
+            'loaded': self._loaded.is_set(),
+            'models': {name: model.method for name, model in self.models.items()},
+            'load_seconds': {name: round(s, 4) for name, s in self.load_seconds.items()},
+            'errors': dict(self.load_errors),
+            'memoized': len(self._memo),
+        }
+
+
+def format_forecast(forecast: Forecast) -> str:
+    indicator = forecast.indicator
+    unit = f" {indicator.unit}" if indicator.unit else ''
+    digits = 3 if indicator.name == 'ocean_ph' else 2
+    points = ', '.join(f"{year}: {value:.{digits}f}{unit}"
+                       for year, value in zip(forecast.years.tolist(), forecast.values.tolist()))
+    return f"Forecast {indicator.label} ({forecast.method}): {points}."
+
+
+def forecast_years(years: Sequence[int], last_year: Optional[int]) -> List[int]:
+    """The future years among years, in order; the next decade's end if none were given"""
+    if last_year is None:
+        return []
+    future = sorted({y for y in years if last_year < y <= MAX_YEAR})
+    if future or years:
+        return future
+    return [last_year + 10]
@@ -1,6 +1,8 @@
 # init_db.py
 from app import app, db
+from models import create_indexes
 
 with app.app_context():
     db.create_all()
+    create_indexes()
     print("Database tables created successfully!")
@@ -0,0 +1,166 @@
+from typing import Dict, Iterator, Optional
+import json
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+# Upstream statuses that are safe to retry and count against upstream health
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+def _never_sent(error: requests.exceptions.ConnectionError) -> bool:
+    """True when the connection was never established, so the request was not sent"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    # NewConnectionError (refused, DNS failure) subclasses ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class CohereClient:
+    """Keep-alive HTTP client for the Cohere generate endpoint with retries and a circuit breaker"""
+
+    def __init__(self, api_url: str, headers: Dict[str, str], connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0, max_retries: int = 2, backoff: float = 0.25,
+                 pool_size: int = 10, breaker: Optional[CircuitBreaker] = None):
+        self.api_url = api_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def generate(self, payload: Dict) -> Dict:
+        """POST a generation request and return the decoded JSON body"""
+        return self._post(payload).json()
+
+    def stream_generate(self, payload: Dict) -> Iterator[Dict]:
+        """POST a streaming generation request and yield each newline-delimited JSON event.
+
+        The breaker hears about the call only once the body is done: a stream that dies
+        midway (reset, read timeout, truncated chunk, garbled event) is a failure.
+        """
+        response = self._post(dict(payload, stream=True), stream=True)
+        failed = False
+        with response:
+            try:
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+            except (requests.exceptions.RequestException, ValueError):
+                failed = True
+                self.breaker.record_failure()
+                raise
+            finally:
+                # Also reached when the caller stops reading after its last event
+                if not failed:
+                    self.breaker.record_success()
+
+    def _post(self, payload: Dict, stream: bool = False) -> requests.Response:
+        """POST with retries and breaker accounting; raises for error statuses.
+
+        A successful streamed response is left for the caller to record once its body is read.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Cohere API circuit is open after repeated upstream failures")
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=stream)
+                if response.status_code in RETRYABLE_STATUSES and attempt < self.max_retries:
+                    response.close()
+                    attempt += 1
+                    self._sleep(attempt)
+                    continue
+                if response.status_code in RETRYABLE_STATUSES:
+                    self.breaker.record_failure()
+                elif not (stream and response.ok):
+                    self.breaker.record_success()
+                response.raise_for_status()
+                return response
+            except requests.exceptions.ConnectionError as e:
+                # Only a connect timeout or a refused/unresolvable connection proves the request
+                # never reached upstream; a reset after sending it may have started a generation
+                if _never_sent(e) and attempt < self.max_retries:
+                    attempt += 1
+                    self._sleep(attempt)
+                    continue
+                self.breaker.record_failure()
+                raise
+            except requests.exceptions.Timeout:
+                # A read timeout already held this worker for the full budget; do not retry
+                self.breaker.record_failure()
+                raise
+            except requests.exceptions.HTTPError:
+                # From raise_for_status: the breaker already recorded this response
+                raise
+            except requests.exceptions.RequestException:
+                # Anything else (bad URL, redirect loops, broken chunked bodies) still ends the
+                # attempt; recording it keeps a half-open trial from staying in flight forever
+                self.breaker.record_failure()
+                raise
+
+    def _sleep(self, attempt: int):
+        """Exponential backoff with full jitter"""
+        time.sleep(random.uniform(0, self.backoff * (2 ** (attempt - 1))))
+
+    def close(self):
+        self.session.close()
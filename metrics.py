@@ -0,0 +1,214 @@
+"""In-process metrics exposed in the Prometheus text format.
+
+Counters and histograms are plain dicts keyed by label values behind one lock each, so
+recording costs a dict lookup and a few additions: cheap enough to leave on in production.
+Components that already keep their own counters (caches, the write-behind queue, the
+dataset) are read at scrape time through collector callbacks instead of being duplicated.
+
+Every worker process keeps its own registry; with several workers, scrape each one (or
+put them behind a target per worker) and aggregate in Prometheus.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import math
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds; spans sub-millisecond dataset answers to multi-second model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Sample(NamedTuple):
+    suffix: str                 # appended to the family name, e.g. _bucket
+    labels: Tuple[Tuple[str, str], ...]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    kind: str                   # counter | gauge | histogram
+    help: str
+    samples: List[Sample]
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            values = list(self._values.items())
+        return MetricFamily(self.name, self.kind, self.help,
+                            [Sample('_total', tuple(zip(self.labelnames, labels)), value)
+                             for labels, value in values])
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: one count per bucket plus +Inf, then the sum
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            counts[i] += 1
+            counts[-1] += value
+
+    def time(self, labels: Tuple[str, ...] = ()) -> 'Timer':
+        return Timer(self, labels)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            values = [(labels, list(counts)) for labels, counts in self._values.items()]
+        samples = []
+        for labels, counts in values:
+            named = tuple(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(Sample('_bucket', named + (('le', _format_value(bound)),), cumulative))
+            samples.append(Sample('_sum', named, counts[-1]))
+            samples.append(Sample('_count', named, cumulative))
+        return MetricFamily(self.name, self.kind, self.help, samples)
+
+
+class Timer:
+    """Context manager observing the elapsed time into a histogram"""
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """The counter called name, created on first registration"""
+        return self._register(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def collector(self, fn: Callable[[], Iterable[MetricFamily]]):
+        """Register fn to produce metric families at scrape time"""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for fn in collectors:
+            try:
+                families.extend(fn())
+            except Exception as e:
+                # One broken collector must not take the whole scrape down
+                print(f"Metrics collector {getattr(fn, '__name__', fn)} failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for sample in family.samples:
+                labels = ','.join(f'{key}="{_escape_label(str(value))}"' for key, value in sample.labels)
+                name = family.name + sample.suffix
+                lines.append(f"{name}{{{labels}}} {_format_value(sample.value)}" if labels
+                             else f"{name} {_format_value(sample.value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def gauge(name: str, help: str, value: float, labels: Optional[Dict[str, str]] = None) -> MetricFamily:
+    """Single-sample gauge family, for collectors"""
+    return MetricFamily(name, 'gauge', help, [Sample('', tuple((labels or {}).items()), float(value))])
+
+
+def from_stats(prefix: str, stats: Dict, help: str, counters: Iterable[str] = ()) -> List[MetricFamily]:
+    """Families for the numeric entries of a component's stats() dict.
+
+    Keys in counters become prefix_key_total counters; every other number is a gauge.
+    """
+    counters = set(counters)
+    families = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        if key in counters:
+            families.append(MetricFamily(name, 'counter', f"{help}: {key}", [Sample('_total', (), float(value))]))
+        else:
+            families.append(gauge(name, f"{help}: {key}", value))
+    return families
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape_label(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+# The process-wide registry /metrics renders
+REGISTRY = Registry()
@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import atexit
+import multiprocessing
+import threading
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug's current default; hashes stored with other parameters are upgraded on login
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+# The pool starts lazily from a request thread; forking a multi-threaded server process can
+# copy locks held by other threads into the child, so workers come from a clean server process
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PasswordHasher:
+    """Runs the deliberately expensive password KDFs in a process pool.
+
+    Request threads only wait on a future, so they hold neither the CPU nor the
+    GIL while a hash is computed. workers=0 hashes inline in the calling thread.
+    """
+
+    def __init__(self, workers: Optional[int] = None, method: str = DEFAULT_METHOD):
+        self.workers = workers
+        self.method = method
+        self._pool = None
+        self._prefix = None
+        self._lock = threading.Lock()
+        # Separate from _lock, which hash() takes to reach the pool
+        self._prefix_lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(START_METHOD))
+            return self._pool
+
+    def hash(self, password: str) -> str:
+        pool = self._executor()
+        if pool is None:
+            return generate_password_hash(password, method=self.method)
+        return pool.submit(generate_password_hash, password, self.method).result()
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        pool = self._executor()
+        if pool is None:
+            return check_password_hash(password_hash, password)
+        return pool.submit(check_password_hash, password_hash, password).result()
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when a stored hash uses a different method or cost parameters than configured"""
+        return password_hash.split('$', 1)[0] != self.prefix
+
+    @property
+    def prefix(self) -> str:
+        """The method and parameters werkzeug writes for self.method, e.g. scrypt:32768:8:1 for scrypt.
+
+        Taken from one real hash, computed once in the pool like any other, so a bare method
+        name compares equal to the fully parameterised prefix stored with each password.
+        """
+        with self._prefix_lock:
+            if self._prefix is None:
+                self._prefix = self.hash('').split('$', 1)[0]
+            return self._prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,133 @@
+from typing import List, NamedTuple, Optional, Tuple
+import re
+
+# Year windows: "between 2005 and 2015", "from 2005 to 2015", "2005-2015", "since 2010", "until 2000"
+SPAN_PATTERN = (r'(?:between|from)\s+\d{4}\s*(?:and|to|until|through|-|–)\s*\d{4}'
+                r'|\d{4}\s*(?:-|–|to|through)\s*\d{4}'
+                r'|(?:since|from|after|before|until|till|through|up to)\s+\d{4}')
+
+# Dataset intents in priority order: the first matching intent is answered first
+INTENT_PATTERNS = [
+    ('forecast', r'forecast|predict|project(?:ion|ed)'),
+    ('range', SPAN_PATTERN),
+    ('co2', r'co2|co₂|carbon dioxide'),
+    ('temperature', r'temperature|temp_anomaly|warming'),
+    ('sea_level', r'sea level|gmsl|sea-level'),
+    ('forest', r'forest|deforestation|vegetation'),
+    ('ocean', r'ocean|ph|acidification'),
+    ('ozone', r'ozone'),
+    ('precipitation', r'precipitation|rainfall|rain'),
+    ('sea_ice', r'sea ice|arctic ice|ice extent'),
+    ('trend', r'trend|change over time|historical'),
+    ('current', r'current|latest|recent'),
+    ('comparison', r'compare|comparison|difference'),
+]
+
+EXAMPLE_WORDS = ['example', 'explain', 'detail', 'elaborate']
+DATA_WORDS = ['number', 'data', 'statistic', 'value', 'how much']
+YEAR_CONTEXT_WORDS = ('year', 'in', 'during', 'since')
+# Future tense only asks for a forecast together with a year ("what will co2 be in 2040");
+# without one it is a causal question ("how will warming affect crops?") for the model
+OUTLOOK_PATTERN = r'\bwill\b|expected to|future'
+
+# Aggregate asked for over a year window; the earliest word in the query wins
+AGGREGATE_PATTERNS = [
+    ('min', r'lowest|minimum|min|smallest|least'),
+    ('max', r'highest|maximum|max|peak|largest|most'),
+    ('sum', r'total|sum|cumulative|combined'),
+    ('change', r'change[ds]?|increase[ds]?|decrease[ds]?|rise|rose|fall|fell|grow|grew|drop(?:ped)?'
+               r'|difference|trend|rate'),
+    ('mean', r'average|mean|typical'),
+]
+_AGGREGATES = re.compile('|'.join(f'(?P<{name}>\\b(?:{pattern})\\b)' for name, pattern in AGGREGATE_PATTERNS))
+_SPAN_YEARS = re.compile(r'\d{4}')
+
+
+class Route(NamedTuple):
+    intents: Tuple[str, ...]
+    year: Optional[int]
+    decade: Optional[int]
+    years: Tuple[int, ...]
+    wants_examples: bool
+    wants_data: bool
+    span: Optional[Tuple[Optional[int], Optional[int]]] = None    # inclusive (start, end) years
+    aggregate: Optional[str] = None
+    speculative: bool = False   # future tense with no year and no forecast word
+
+
+def parse_span(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """Inclusive (start, end) years of a SPAN_PATTERN match; None is an open end"""
+    years = [int(y) for y in _SPAN_YEARS.findall(text)]
+    if len(years) >= 2:
+        return min(years[:2]), max(years[:2])
+    if text.startswith(('since', 'from')):
+        return years[0], None
+    if text.startswith('after'):
+        return years[0] + 1, None
+    if text.startswith('before'):
+        return None, years[0] - 1
+    return None, years[0]
+
+
+class QueryRouter:
+    """Single-pass intent router over one precompiled alternation"""
+
+    def __init__(self, intent_patterns: List[Tuple[str, str]] = INTENT_PATTERNS):
+        self.intents = [name for name, _ in intent_patterns]
+        self._priority = {name: i for i, name in enumerate(self.intents)}
+        groups = [f'(?P<i{i}>{pattern})' for i, (_, pattern) in enumerate(intent_patterns)]
+        groups.append('(?P<examples>' + '|'.join(map(re.escape, EXAMPLE_WORDS)) + ')')
+        groups.append('(?P<data>' + '|'.join(map(re.escape, DATA_WORDS)) + ')')
+        groups.append(f'(?P<outlook>{OUTLOOK_PATTERN})')
+        # A trailing s makes it a decade ("the 1990s"), not a year
+        groups.append(r'(?P<year>\d{4}s?)')
+        self._scanner = re.compile('|'.join(groups))
+
+    def route(self, query: str) -> Route:
+        """Tokenize a lower-cased query once and return its intents, years and flags"""
+        matched = set()
+        years = []
+        year = decade = span = None
+        wants_examples = wants_data = outlook = False
+        for match in self._scanner.finditer(query):
+            kind = match.lastgroup
+            if kind == 'year':
+                value = int(match.group()[:4])
+                years.append(value)
+                if match.group().endswith('s'):
+                    if decade is None:
+                        decade = (value // 10) * 10
+                elif year is None and query[:match.start()].rstrip().endswith(YEAR_CONTEXT_WORDS):
+                    year = value
+            elif kind == 'examples':
+                wants_examples = True
+            elif kind == 'data':
+                wants_data = True
+            elif kind == 'outlook':
+                outlook = True
+            else:
+                intent = self.intents[int(kind[1:])]
+                matched.add(intent)
+                if intent == 'range':
+                    # The window's years are still years of the query, with the usual context rule
+                    for y in _SPAN_YEARS.finditer(match.group()):
+                        years.append(int(y.group()))
+                        if year is None and query[:match.start() + y.start()].rstrip().endswith(YEAR_CONTEXT_WORDS):
+                            year = int(y.group())
+                    if span is None:
+                        span = parse_span(match.group())
+        speculative = False
+        if outlook and 'forecast' not in matched:
+            if years:
+                matched.add('forecast')
+            else:
+                speculative = True
+        intents = tuple(sorted(matched, key=self._priority.__getitem__))
+        if decade is None and year:
+            decade = (year // 10) * 10
+        aggregate = None
+        if span is not None:
+            found = _AGGREGATES.search(query)
+            aggregate = found.lastgroup if found else None
+        return Route(intents, year, decade, tuple(years), wants_examples, wants_data, span, aggregate,
+                     speculative)
@@ -0,0 +1,110 @@
+"""One published copy of the dataset, memory-mapped read-only by every worker process.
+
+A publication is a feature store file (see feature_store.py) named after its version in a
+shared directory; put the directory on a RAM-backed filesystem such as /dev/shm. Workers map
+it, so however many processes serve requests, the page cache holds the columns once.
+An 8-byte counter file, also mapped, holds the latest version: checking it costs a memory
+read, and a worker that sees a new number remaps. Publishing is serialised by a file lock,
+so when every worker notices the same changed source only the first one loads it.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+import os
+import re
+import numpy as np
+from feature_store import FeatureStore, read_store, write_store
+
+VERSION_FILE = 'version'
+LOCK_FILE = 'publish.lock'
+# Older publications are unlinked; workers still mapping one keep a valid mapping
+KEEP_VERSIONS = 2
+
+_STORE_NAME = re.compile(r'^dataset\.v(\d+)\.columnar$')
+
+
+def _fingerprint(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+class SharedDataset:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        counter = self._path(VERSION_FILE)
+        with self._locked():
+            if not os.path.exists(counter) or os.path.getsize(counter) < 8:
+                with open(counter, 'wb') as f:
+                    f.write(bytes(8))
+        # Updated in place, never replaced, so every process keeps seeing the same page
+        self._counter = np.memmap(counter, dtype='<u8', mode='r+', shape=(1,))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _store_path(self, version: int) -> str:
+        return self._path(f'dataset.v{version}.columnar')
+
+    @contextmanager
+    def _locked(self):
+        import fcntl
+        with open(self._path(LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def version(self) -> int:
+        """Latest published version; 0 until something has been published"""
+        return int(self._counter[0])
+
+    def attach(self) -> Optional[Tuple[int, FeatureStore]]:
+        """Map the latest publication read-only, or None if nothing is published yet"""
+        while True:
+            version = self.version
+            if not version:
+                return None
+            try:
+                return version, read_store(self._store_path(version))
+            except FileNotFoundError:
+                # Superseded and cleaned up between reading the counter and opening it
+                if self.version == version:
+                    raise
+
+    def publish(self, columns: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> int:
+        """Write a new publication and advance the counter; returns its version"""
+        with self._locked():
+            return self._publish(columns, meta)
+
+    def publish_source(self, source: str,
+                       load: Callable[[], Tuple[Dict[str, np.ndarray], Dict]]) -> Tuple[int, FeatureStore]:
+        """Attach to the publication of source, loading and publishing it first when it is stale.
+
+        load() returns (columns, meta) and only runs in the one process that finds the
+        current publication built from a different version of the source file.
+        """
+        with self._locked():
+            fingerprint = _fingerprint(source)
+            current = self.attach()
+            if current is not None and current[1].meta.get('source') == fingerprint:
+                return current
+            columns, meta = load()
+            version = self._publish(columns, dict(meta, source=fingerprint))
+            return version, read_store(self._store_path(version))
+
+    def _publish(self, columns: Dict[str, np.ndarray], meta: Optional[Dict]) -> int:
+        version = self.version + 1
+        write_store(self._store_path(version), columns, dict(meta or {}, version=version))
+        # The file is complete before the counter points at it
+        self._counter[0] = version
+        self._counter.flush()
+        for name in os.listdir(self.directory):
+            match = _STORE_NAME.match(name)
+            if match and int(match.group(1)) <= version - KEEP_VERSIONS:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+        return version
@@ -1,14 +1,13 @@
 // Environmental Dashboard JavaScript
 class EnvironmentalDashboard {
     constructor() {
-        this.data = {
-            years: [1980, 1985, 1990, 1995, 2000, 2005, 2010, 2015, 2020, 2024],
-            co2_levels: [338.7, 345.9, 354.4, 360.9, 369.5, 379.8, 389.9, 400.8, 414.2, 421.1],
-            temperature_anomaly: [-0.2, -0.1, 0.4, 0.4, 0.4, 0.7, 0.7, 0.9, 1.0, 1.2],
-            sea_level_mm: [0, 15, 30, 45, 65, 85, 110, 135, 165, 185],
-            forest_cover_pct: [31.2, 30.8, 30.3, 29.9, 29.4, 28.9, 28.4, 27.9, 27.4, 27.0],
-            arctic_ice_extent: [7.2, 7.0, 6.8, 6.5, 6.2, 5.8, 5.4, 4.9, 4.3, 4.1]
-        };
+        // Indicator series from /api/series, keyed by indicator name; the server filters
+        // them to the selected range and downsamples them to seriesPoints
+        this.data = {};
+        this.seriesNames = ['co2', 'temperature', 'sea_level', 'forest_cover'];
+        this.seriesPoints = 400;
+        // Model forecasts drawn after the CO2 and temperature series, from /api/forecast
+        this.forecasts = {};
 
 this.keyEvents = [
     {year: 1972, event: "Stockholm Conference", type: "policy"},
@@ -50,10 +49,94 @@ this.keyEvents = [
     init() {
         this.setupEventListeners();
         this.createTimeline();
-        this.createCharts();
-        this.createMiniCharts();
         this.updateLastUpdated();
         this.animateCounters();
+        this.loadData().then(() => {
+            this.createCharts();
+            this.createMiniCharts();
+        });
+    }
+
+    rangeStart() {
+        switch (this.currentDateRange) {
+            case 'recent':
+                return 2010;
+            case 'decade':
+                return 2015;
+            default:
+                return null;
+        }
+    }
+
+    async fetchSeries(name) {
+        const params = new URLSearchParams({points: this.seriesPoints});
+        const start = this.rangeStart();
+        if (start !== null) {
+            params.set('start', start);
+        }
+        // Served with a strong ETag and no-cache, so unchanged series revalidate as a 304
+        const response = await fetch(`/api/series/${name}?${params}`);
+        if (!response.ok) {
+            throw new Error(`${name}: HTTP ${response.status}`);
+        }
+        return response.json();
+    }
+
+    async fetchForecasts() {
+        const response = await fetch('/api/forecast?indicators=co2,temperature');
+        if (!response.ok) {
+            throw new Error(`forecast: HTTP ${response.status}`);
+        }
+        return (await response.json()).forecasts;
+    }
+
+    async loadData() {
+        try {
+            const [series, forecasts] = await Promise.all([
+                Promise.all(this.seriesNames.map(name => this.fetchSeries(name))),
+                this.fetchForecasts().catch(error => {
+                    console.error('Failed to load forecasts:', error);
+                    return {};
+                })
+            ]);
+            series.forEach(s => {
+                this.data[s.indicator] = s;
+            });
+            this.forecasts = forecasts;
+        } catch (error) {
+            console.error('Failed to load environmental data:', error);
+        }
+    }
+
+    forecastDataset(name, color) {
+        const forecast = this.forecasts[name];
+        return {
+            label: `Forecast (${forecast.method})`,
+            data: forecast.years.map((x, i) => ({x: x, y: forecast.values[i]})),
+            borderColor: color,
+            borderDash: [6, 4],
+            fill: false,
+            pointRadius: 0,
+            pointHoverRadius: 4
+        };
+    }
+
+    toPoints(series) {
+        return series.x.map((x, i) => ({x: x, y: series.y[i]}));
+    }
+
+    yearAxis() {
+        return {
+            type: 'linear',
+            title: {
+                display: true,
+                text: 'Year'
+            },
+            ticks: {
+                precision: 0,
+                callback: value => value
+            }
+        };
     }
 
     setupEventListeners() {
@@ -132,48 +215,23 @@ this.keyEvents = [
         });
     }
 
-    getFilteredData() {
-        let startIndex = 0;
-        let endIndex = this.data.years.length;
-
-        switch (this.currentDateRange) {
-            case 'recent':
-                startIndex = this.data.years.findIndex(year => year >= 2010);
-                break;
-            case 'decade':
-                startIndex = this.data.years.findIndex(year => year >= 2015);
-                break;
-        }
-
-        return {
-            years: this.data.years.slice(startIndex, endIndex),
-            co2_levels: this.data.co2_levels.slice(startIndex, endIndex),
-            temperature_anomaly: this.data.temperature_anomaly.slice(startIndex, endIndex),
-            sea_level_mm: this.data.sea_level_mm.slice(startIndex, endIndex),
-            forest_cover_pct: this.data.forest_cover_pct.slice(startIndex, endIndex),
-            arctic_ice_extent: this.data.arctic_ice_extent.slice(startIndex, endIndex)
-        };
-    }
-
     createCharts() {
-        const filteredData = this.getFilteredData();
-
         // CO2 Chart
-        this.createCO2Chart(filteredData);
+        this.createCO2Chart(this.data.co2);
         
         // Temperature Chart
-        this.createTemperatureChart(filteredData);
+        this.createTemperatureChart(this.data.temperature);
         
         // Regional Chart
         this.createRegionalChart();
         
         // Combined Chart
-        this.createCombinedChart(filteredData);
+        this.createCombinedChart(this.data.sea_level, this.data.forest_cover);
     }
 
-    createCO2Chart(data) {
+    createCO2Chart(series) {
         const ctx = document.getElementById('co2Chart');
-        if (!ctx) return;
+        if (!ctx || !series) return;
 
         if (this.charts.co2) {
             this.charts.co2.destroy();
@@ -182,17 +240,16 @@ this.keyEvents = [
         this.charts.co2 = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: data.years,
                 datasets: [{
                     label: 'CO₂ Concentration (ppm)',
-                    data: data.co2_levels,
+                    data: this.toPoints(series),
                     borderColor: '#FF6B35',
                     backgroundColor: 'rgba(255, 107, 53, 0.1)',
                     fill: true,
-                    tension: 0.4,
-                    pointRadius: 6,
-                    pointHoverRadius: 8
-                }]
+                    tension: 0,
+                    pointRadius: 0,
+                    pointHoverRadius: 4
+                }].concat(this.forecasts.co2 ? [this.forecastDataset('co2', '#FF6B35')] : [])
             },
             options: {
                 responsive: true,
@@ -210,20 +267,15 @@ this.keyEvents = [
                             text: 'CO₂ (ppm)'
                         }
                     },
-                    x: {
-                        title: {
-                            display: true,
-                            text: 'Year'
-                        }
-                    }
+                    x: this.yearAxis()
                 }
             }
         });
     }
 
-    createTemperatureChart(data) {
+    createTemperatureChart(series) {
         const ctx = document.getElementById('tempChart');
-        if (!ctx) return;
+        if (!ctx || !series) return;
 
         if (this.charts.temperature) {
             this.charts.temperature.destroy();
@@ -232,17 +284,16 @@ this.keyEvents = [
         this.charts.temperature = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: data.years,
                 datasets: [{
                     label: 'Temperature Anomaly (°C)',
-                    data: data.temperature_anomaly,
+                    data: this.toPoints(series),
                     borderColor: '#DC143C',
                     backgroundColor: 'rgba(220, 20, 60, 0.2)',
                     fill: true,
-                    tension: 0.4,
-                    pointRadius: 6,
-                    pointHoverRadius: 8
-                }]
+                    tension: 0,
+                    pointRadius: 0,
+                    pointHoverRadius: 4
+                }].concat(this.forecasts.temperature ? [this.forecastDataset('temperature', '#DC143C')] : [])
             },
             options: {
                 responsive: true,
@@ -259,12 +310,7 @@ this.keyEvents = [
                             text: 'Temperature Anomaly (°C)'
                         }
                     },
-                    x: {
-                        title: {
-                            display: true,
-                            text: 'Year'
-                        }
-                    }
+                    x: this.yearAxis()
                 }
             }
         });
@@ -333,9 +379,9 @@ this.keyEvents = [
         });
     }
 
-    createCombinedChart(data) {
+    createCombinedChart(seaLevel, forestCover) {
         const ctx = document.getElementById('combinedChart');
-        if (!ctx) return;
+        if (!ctx || !seaLevel || !forestCover) return;
 
         if (this.charts.combined) {
             this.charts.combined.destroy();
@@ -344,16 +390,16 @@ this.keyEvents = [
         this.charts.combined = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: data.years,
                 datasets: [{
                     label: 'Sea Level Rise (mm)',
-                    data: data.sea_level_mm,
+                    data: this.toPoints(seaLevel),
                     borderColor: '#1E90FF',
                     backgroundColor: 'rgba(30, 144, 255, 0.1)',
+                    pointRadius: 0,
                     yAxisID: 'y'
                 }, {
                     label: 'Forest Cover (%)',
-                    data: data.forest_cover_pct,
+                    data: this.toPoints(forestCover),
                     borderColor: '#228B22',
                     backgroundColor: 'rgba(34, 139, 34, 0.1)',
                     yAxisID: 'y1'
@@ -367,13 +413,7 @@ this.keyEvents = [
                     intersect: false,
                 },
                 scales: {
-                    x: {
-                        display: true,
-                        title: {
-                            display: true,
-                            text: 'Year'
-                        }
-                    },
+                    x: this.yearAxis(),
                     y: {
                         type: 'linear',
                         display: true,
@@ -402,16 +442,18 @@ this.keyEvents = [
 
     createMiniCharts() {
         // CO2 Mini Chart
-        this.createMiniChart('co2-mini-chart', this.data.co2_levels.slice(-5), '#FF6B35');
+        this.createMiniChart('co2-mini-chart', this.data.co2, '#FF6B35');
         
         // Temperature Mini Chart
-        this.createMiniChart('temp-mini-chart', this.data.temperature_anomaly.slice(-5), '#DC143C');
+        this.createMiniChart('temp-mini-chart', this.data.temperature, '#DC143C');
     }
 
-    createMiniChart(elementId, data, color) {
+    createMiniChart(elementId, series, color) {
         const container = document.getElementById(elementId);
-        if (!container) return;
+        if (!container || !series) return;
 
+        const data = series.y.slice(-24);
+        container.innerHTML = '';
         const canvas = document.createElement('canvas');
         canvas.width = 120;
         canvas.height = 40;
@@ -451,7 +493,7 @@ this.keyEvents = [
 
     updateDateRange(range) {
         this.currentDateRange = range;
-        this.createCharts();
+        this.loadData().then(() => this.createCharts());
     }
 
     showHotspotDetails(location) {
@@ -541,18 +583,14 @@ this.keyEvents = [
 
     // Method to refresh all data (could be called periodically)
     refreshData() {
-        // In a real application, this would fetch new data from an API
         console.log('Refreshing environmental data...');
         this.updateLastUpdated();
         
-        // Simulate data update with slight variations
-        const lastIndex = this.data.years.length - 1;
-        this.data.co2_levels[lastIndex] += Math.random() * 0.1 - 0.05;
-        this.data.temperature_anomaly[lastIndex] += Math.random() * 0.02 - 0.01;
-        
-        // Update charts
-        this.createCharts();
-        this.createMiniCharts();
+        // Unchanged series come back as 304s; only a new ETL run sends data
+        this.loadData().then(() => {
+            this.createCharts();
+            this.createMiniCharts();
+        });
     }
 
     // Method to export data (could be useful for users)
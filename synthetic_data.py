@@ -0,0 +1,200 @@
+"""Vectorized, seedable synthetic climate series for ETL fallbacks and load testing.
+
+Every generator takes a year range, a resolution ('annual', 'monthly' or 'daily'), a number of
+regions and a seed, and builds the whole series with array operations.
+regions=1 yields the global series with the same columns as data/*.csv; more regions add a
+'region' column with a per-region offset, e.g. 200 regions of daily data since 1880 is ~10.6M rows.
+
+Usage: python synthetic_data.py [--resolution daily] [--regions 200] [--seed 0] [--out DIR]
+"""
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Union
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = {'annual': 'Y', 'monthly': 'M', 'daily': 'D'}
+
+Seed = Optional[Union[int, np.random.Generator]]
+
+
+class TimeAxis(NamedTuple):
+    periods: Dict[str, np.ndarray]  # period columns: year, plus month/day below annual resolution
+    t: np.ndarray                   # decimal year at the start of each period
+    step: np.ndarray                # period length in years
+
+
+def time_axis(start: int, end: int, resolution: str = 'annual') -> TimeAxis:
+    """Every period from the start of `start` through the end of `end`, inclusive"""
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {sorted(RESOLUTIONS)}")
+    unit = RESOLUTIONS[resolution]
+    stamps = np.arange(np.datetime64(str(start), unit), np.datetime64(str(end + 1), unit))
+    year_start = stamps.astype('datetime64[Y]')
+    years = (year_start.astype(np.int64) + 1970).astype(np.int32)
+    periods = {'year': years}
+    if resolution == 'annual':
+        return TimeAxis(periods, years.astype(float), np.ones(len(years)))
+    if resolution == 'monthly':
+        periods['month'] = (stamps.astype(np.int64) % 12 + 1).astype(np.int8)
+        return TimeAxis(periods, years + (periods['month'] - 1) / 12, np.full(len(years), 1 / 12))
+    days = stamps.astype('datetime64[D]')
+    month_start = days.astype('datetime64[M]')
+    periods['month'] = (month_start.astype(np.int64) % 12 + 1).astype(np.int8)
+    periods['day'] = ((days - month_start.astype('datetime64[D]')).astype(np.int64) + 1).astype(np.int8)
+    day_of_year = (days - year_start.astype('datetime64[D]')).astype(np.int64)
+    year_length = ((year_start + 1).astype('datetime64[D]') - year_start.astype('datetime64[D]')).astype(np.int64)
+    return TimeAxis(periods, years + day_of_year / year_length, 1 / year_length)
+
+
+class Grid(NamedTuple):
+    axis: TimeAxis
+    regions: int
+    t: np.ndarray       # (regions, periods) decimal years
+    step: np.ndarray    # (regions, periods) period lengths
+    rng: np.random.Generator
+
+    @property
+    def shape(self):
+        return self.t.shape
+
+    def normal(self, scale) -> np.ndarray:
+        return self.rng.normal(0.0, 1.0, self.shape) * scale
+
+    def region_offset(self, scale: float) -> np.ndarray:
+        """Per-region level shift; zero for a single global series"""
+        if self.regions == 1:
+            return np.zeros((1, 1))
+        return self.rng.normal(0.0, scale, (self.regions, 1))
+
+    def frame(self, values: Dict[str, np.ndarray]) -> pd.DataFrame:
+        n_periods = self.t.shape[1]
+        columns = {}
+        if self.regions > 1:
+            columns['region'] = np.repeat(np.arange(self.regions, dtype=np.int32), n_periods)
+        for name, column in self.axis.periods.items():
+            columns[name] = np.tile(column, self.regions)
+        for name, column in values.items():
+            columns[name] = np.broadcast_to(column, self.shape).ravel()
+        return pd.DataFrame(columns)
+
+
+def _grid(start: int, end: int, resolution: str, regions: int, seed: Seed) -> Grid:
+    if regions < 1:
+        raise ValueError("regions must be at least 1")
+    axis = time_axis(start, end, resolution)
+    t = np.broadcast_to(axis.t, (regions, len(axis.t)))
+    step = np.broadcast_to(axis.step, (regions, len(axis.step)))
+    return Grid(axis, regions, t, step, np.random.default_rng(seed))
+
+
+def temperature(start: int = 1880, end: int = 2024, resolution: str = 'annual',
+                regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    x = g.t - 1880
+    # ~0.8°C per century, accelerating after 1980, with multidecadal variability
+    trend = x * 0.008 + np.where(g.t > 1980, (g.t - 1980) * 0.012, 0.0)
+    natural = 0.3 * np.sin(x * 0.1) * np.cos(x * 0.05)
+    anomaly = trend + natural + g.normal(0.15) + g.region_offset(0.3)
+    return g.frame({'temp_anomaly': np.round(anomaly, 2)})
+
+
+def co2(start: int = 1958, end: int = 2024, resolution: str = 'monthly',
+        regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    # 315 ppm in 1958 rising ~1.6 ppm/year, with a seasonal cycle peaking in spring
+    base = 315 + (g.t - 1958) * 1.6
+    seasonal = 3 * np.cos(2 * np.pi * (g.t % 1 - 0.2))
+    value = base + seasonal + g.normal(0.5) + g.region_offset(1.0)
+    return g.frame({'decimal': g.t, 'co2': value, 'season_adj': value, 'fit': value,
+                    'fit_seas': value, 'days': np.int64(-1)})
+
+
+def sea_ice(start: int = 1979, end: int = 2024, resolution: str = 'annual',
+            regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    # ~80,000 km²/year decline from 13.5 million km², floored at a physical minimum
+    extent = 13.5 - (g.t - 1979) * 0.08 + g.normal(0.8) + g.region_offset(0.5)
+    return g.frame({'extent': np.round(np.maximum(extent, 3.5), 2)})
+
+
+def sea_level(start: int = 1880, end: int = 2024, resolution: str = 'annual',
+              regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    # mm/year: ~1.7 before the satellite era, then ~2.8 and accelerating
+    rate = np.where(g.t < 1993, 1.7 + g.normal(0.5), 2.8 + (g.t - 1993) * 0.08 + g.normal(0.8))
+    rate = rate * (1 + g.region_offset(0.2))
+    return g.frame({'gmsl_mm': np.round(np.cumsum(rate * g.step, axis=1), 1)})
+
+
+def forest_loss(start: int = 2001, end: int = 2024, resolution: str = 'annual',
+                regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    # ha/year rising from ~8M, floored at 5M; reported per period at finer resolutions
+    annual = np.maximum(8000000 + (g.t - 2001) * 250000 + g.normal(1500000), 5000000)
+    loss = annual * g.step / regions * (1 + g.region_offset(0.3))
+    return g.frame({'loss_ha': np.maximum(loss, 0).astype(np.int64)})
+
+
+def ocean_ph(start: int = 1988, end: int = 2024, resolution: str = 'annual',
+             regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    # Declining from ~8.1 by ~0.002 per year
+    ph = 8.1 - (g.t - 1988) * 0.002 + g.normal(0.01) + g.region_offset(0.02)
+    return g.frame({'ocean_ph': np.round(ph, 3)})
+
+
+def precipitation(start: int = 1900, end: int = 2024, resolution: str = 'annual',
+                  regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    anomaly = g.normal(15) + 5 * np.sin((g.t - 1900) * 0.1) + g.region_offset(5.0)
+    return g.frame({'precip_anomaly': np.round(anomaly, 1)})
+
+
+def ozone(start: int = 1979, end: int = 2024, resolution: str = 'annual',
+          regions: int = 1, seed: Seed = None) -> pd.DataFrame:
+    g = _grid(start, end, resolution, regions, seed)
+    # Total column ozone in Dobson Units: depletion into the mid-1990s, then slow recovery
+    depletion = 9.0 * np.clip((g.t - 1979) / 16, 0.0, 1.0)
+    recovery = np.maximum(g.t - 1995, 0.0) * 0.1
+    du = 306 - depletion + recovery + g.normal(1.0) + g.region_offset(10.0)
+    return g.frame({'ozone': np.round(du, 1)})
+
+
+# Keyed by the data/*.csv file stem each generator stands in for
+GENERATORS: Dict[str, Callable[..., pd.DataFrame]] = {
+    'temp': temperature,
+    'co2': co2,
+    'seaice': sea_ice,
+    'gmsl': sea_level,
+    'forest': forest_loss,
+    'ocean_ph': ocean_ph,
+    'precipitation': precipitation,
+    'ozone': ozone,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', choices=sorted(RESOLUTIONS), default='daily')
+    parser.add_argument('--regions', type=int, default=200)
+    parser.add_argument('--start', type=int, default=1880)
+    parser.add_argument('--end', type=int, default=2024)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=sorted(GENERATORS))
+    parser.add_argument('--out', help='write <name>.csv files here (default: only time generation)')
+    args = parser.parse_args()
+
+    for name in args.only or GENERATORS:
+        start = time.perf_counter()
+        df = GENERATORS[name](args.start, args.end, args.resolution, args.regions, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14} {len(df):>11,} rows  {elapsed:6.2f} s  {len(df) / elapsed / 1e6:6.1f} M rows/s")
+        if args.out:
+            Path(args.out).mkdir(parents=True, exist_ok=True)
+            df.to_csv(Path(args.out) / f"{name}.csv", index=False)
+
+
+if __name__ == '__main__':
+    main()
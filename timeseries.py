@@ -0,0 +1,202 @@
+"""Indicator time series for the dashboard, read from the ETL's data/*.csv output.
+
+Each series is collapsed to one value per period (the mean across regions, if any) at the
+finest resolution the file has, filtered to a year range and downsampled to a point budget
+with Largest-Triangle-Three-Buckets, which keeps peaks and troughs a stride would drop.
+Encoded responses (JSON plus its gzip) are cached per file version, so a request for a
+range and budget already served costs a dict lookup and no compression.
+"""
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+import gzip
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from response_cache import LRUCache
+
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+PERIOD_COLUMNS = ('year', 'month', 'day')
+
+# Approximate global forest area in 2000 and ice-free land area, for cover derived from gross loss
+FOREST_AREA_2000_HA = 4.23e9
+LAND_AREA_HA = 13.0e9
+
+
+def forest_cover_pct(loss_ha: np.ndarray) -> np.ndarray:
+    """Forest cover as % of land from per-period gross loss since 2001"""
+    return (FOREST_AREA_2000_HA - np.cumsum(loss_ha)) / LAND_AREA_HA * 100
+
+
+class Indicator(NamedTuple):
+    name: str
+    dataset: str        # data/<dataset>.csv
+    column: str
+    label: str
+    unit: str
+    derive: Optional[str] = None    # 'forest_cover': cumulative loss -> cover %
+
+
+INDICATORS: Dict[str, Indicator] = {i.name: i for i in [
+    Indicator('co2', 'co2', 'co2', 'CO₂ concentration', 'ppm'),
+    Indicator('temperature', 'temp', 'temp_anomaly', 'Temperature anomaly', '°C'),
+    Indicator('sea_level', 'gmsl', 'gmsl_mm', 'Global mean sea level', 'mm'),
+    Indicator('forest_loss', 'forest', 'loss_ha', 'Forest loss', 'ha'),
+    Indicator('forest_cover', 'forest', 'loss_ha', 'Forest cover', '% of land', 'forest_cover'),
+    Indicator('ocean_ph', 'ocean_ph', 'ocean_ph', 'Ocean pH', 'pH'),
+    Indicator('precipitation', 'precipitation', 'precip_anomaly', 'Precipitation anomaly', 'mm'),
+    Indicator('ozone', 'ozone', 'ozone', 'Total column ozone', 'DU'),
+    Indicator('sea_ice', 'seaice', 'extent', 'Arctic sea ice extent', 'million km²'),
+]}
+
+
+class Series(NamedTuple):
+    indicator: Indicator
+    version: Tuple      # (mtime_ns, size) of the source file
+    years: np.ndarray   # int, ascending
+    x: np.ndarray       # decimal year at the start of each period
+    y: np.ndarray
+
+
+class EncodedSeries(NamedTuple):
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def decimal_years(years: np.ndarray, months: Optional[np.ndarray] = None,
+                  days: Optional[np.ndarray] = None) -> np.ndarray:
+    """Decimal year at the start of each period, as synthetic_data.time_axis defines it"""
+    if months is None:
+        return years.astype(np.float64)
+    if days is None:
+        return years + (months - 1) / 12
+    month_start = ((years - 1970) * 12 + months - 1).astype('datetime64[M]').astype('datetime64[D]')
+    dates = month_start + (days - 1).astype('timedelta64[D]')
+    year_start = dates.astype('datetime64[Y]')
+    day_of_year = (dates - year_start.astype('datetime64[D]')).astype(np.int64)
+    year_length = ((year_start + 1).astype('datetime64[D]') - year_start.astype('datetime64[D]')).astype(np.int64)
+    return years + day_of_year / year_length
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the threshold points Largest-Triangle-Three-Buckets keeps, first and last included"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # threshold - 2 buckets over the interior points; each holds at least one point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    # Third triangle vertex: the average of the following bucket (the last point for the last bucket)
+    next_x = np.append(((cum_x[ends] - cum_x[starts]) / counts)[1:], x[-1])
+    next_y = np.append(((cum_y[ends] - cum_y[starts]) / counts)[1:], y[-1])
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = starts[b], ends[b]
+        area = np.abs((x[a] - next_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+
+def load_series(path: Path, indicator: Indicator) -> Series:
+    """One value per period (mean across regions), ordered, NaNs dropped"""
+    import pandas as pd
+    stat = os.stat(path)
+    header = pd.read_csv(path, nrows=0).columns
+    periods = [c for c in PERIOD_COLUMNS if c in header]
+    df = pd.read_csv(path, usecols=periods + [indicator.column]).apply(pd.to_numeric, errors='coerce')
+    df = df.dropna().groupby(periods, as_index=False)[indicator.column].mean()
+    columns = {c: df[c].to_numpy(dtype=np.int64) for c in periods}
+    y = df[indicator.column].to_numpy(dtype=np.float64)
+    if indicator.derive == 'forest_cover':
+        y = forest_cover_pct(y)
+    x = decimal_years(columns['year'], columns.get('month'), columns.get('day'))
+    return Series(indicator, (stat.st_mtime_ns, stat.st_size), columns['year'], x, y)
+
+
+class SeriesStore:
+    """Loaded series, reloaded when their file changes, and a cache of encoded responses"""
+
+    def __init__(self, data_dir='data', cache_entries: int = 256):
+        self.data_dir = Path(data_dir)
+        self.cache = LRUCache(max_entries=cache_entries, ttl=float('inf'))
+        self._series: Dict[str, Series] = {}
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def series(self, name: str) -> Series:
+        indicator = INDICATORS[name]
+        path = self.data_dir / f"{indicator.dataset}.csv"
+        stat = os.stat(path)
+        current = self._series.get(name)
+        if current is not None and current.version == (stat.st_mtime_ns, stat.st_size):
+            return current
+        with self._lock:
+            current = self._series.get(name)
+            if current is None or current.version != (stat.st_mtime_ns, stat.st_size):
+                current = self._series[name] = load_series(path, indicator)
+                self._count('loads')
+                # Precompute the dashboard's default view of the new version
+                self._encode(current, None, None, DEFAULT_POINTS)
+        return current
+
+    def response(self, name: str, start: Optional[int] = None, end: Optional[int] = None,
+                 points: int = DEFAULT_POINTS) -> EncodedSeries:
+        """Encoded series for [start, end] (inclusive years) downsampled to at most points"""
+        points = min(max(points, 3), MAX_POINTS)
+        return self._encode(self.series(name), start, end, points)
+
+    def _encode(self, series: Series, start: Optional[int], end: Optional[int], points: int) -> EncodedSeries:
+        key = (series.indicator.name, series.version, start, end, points)
+        encoded = self.cache.get(key)
+        if encoded is not None:
+            self._count('hits')
+            return encoded
+        self._count('misses')
+        lo = 0 if start is None else int(np.searchsorted(series.years, start, side='left'))
+        hi = len(series.years) if end is None else int(np.searchsorted(series.years, end, side='right'))
+        x, y = series.x[lo:hi], series.y[lo:hi]
+        keep = lttb(x, y, points)
+        indicator = series.indicator
+        payload = {
+            'indicator': indicator.name,
+            'label': indicator.label,
+            'unit': indicator.unit,
+            'start': int(series.years[lo]) if hi > lo else None,
+            'end': int(series.years[hi - 1]) if hi > lo else None,
+            'total': hi - lo,
+            'points': len(keep),
+            'x': np.round(x[keep], 4).tolist(),
+            'y': np.round(y[keep], 4).tolist(),
+        }
+        body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        # Strong validator: identical bytes for identical content, whichever worker built them
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        encoded = EncodedSeries(body, gzip.compress(body, compresslevel=6, mtime=0), etag)
+        self.cache.set(key, encoded)
+        return encoded
+
+    def _count(self, counter: str):
+        with self._count_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        """Response cache hits/misses and series (re)loads for this process"""
+        with self._count_lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'loads': self.loads,
+                'cached_responses': len(self.cache),
+            }